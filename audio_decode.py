@@ -0,0 +1,184 @@
+import subprocess
+import wave
+
+import numpy as np
+from pydub.utils import get_encoder_name, mediainfo
+
+# pydub'ın varsayılanlarıyla aynı: ogg için vorbis kodlayıcı zorlanır
+DEFAULT_CODECS = {"ogg": "libvorbis"}
+# Doğrudan okunup yazılabilen PCM örnek genişlikleri (bayt) ve ffmpeg ham biçim adları
+RAW_FORMATS = {2: "s16le", 3: "s24le", 4: "s32le"}
+
+
+def probe_audio(filepath):
+    """Dosyanın özgün örnekleme hızını, kanal sayısını ve süresini (bilinmiyorsa None) döndürür."""
+    if filepath.lower().endswith(".wav"):
+        try:
+            with wave.open(filepath, "rb") as wav:
+                return wav.getframerate(), wav.getnchannels(), wav.getnframes() / wav.getframerate()
+        except (wave.Error, EOFError):
+            pass
+
+    info = mediainfo(filepath)
+    duration = info.get("duration")
+    return (int(info.get("sample_rate") or 44100), int(info.get("channels") or 2),
+            float(duration) if duration else None)
+
+
+def probe_sample_width(filepath):
+    """
+    Çıktıda korunacak örnek genişliği (bayt). 24 ve 32 bit WAV kaynakları
+    özgün genişliğinde işlenir; diğer tüm dosyalar 16 bit kabul edilir.
+    """
+    if filepath.lower().endswith(".wav"):
+        try:
+            with wave.open(filepath, "rb") as wav:
+                if wav.getsampwidth() in RAW_FORMATS:
+                    return wav.getsampwidth()
+        except (wave.Error, EOFError):
+            pass
+    return 2
+
+
+def iter_pcm_blocks(filepath, sample_rate=44100, channels=2, block_frames=2048, start_ms=0):
+    """
+    Ses dosyasını sabit boyutlu float32 bloklar halinde çözer.
+    Her blok (kare, kanal) şeklindedir ve [-1, 1] aralığındadır. ffmpeg
+    hatayla biterse (ör. bozuk dosya) son bloktan sonra RuntimeError atılır.
+    """
+    bytes_per_frame = 2 * channels
+
+    wav = None
+    if filepath.lower().endswith(".wav"):
+        try:
+            wav = wave.open(filepath, "rb")
+        except (wave.Error, EOFError):
+            # wave modülünün okuyamadığı WAV'lar (ör. float, WAVE_FORMAT_EXTENSIBLE) ffmpeg ile çözülür
+            pass
+    if wav is not None:
+        with wav:
+            # Örnekleme hızı uyan 16/24/32 bit WAV dosyaları ffmpeg olmadan, tam çözünürlükle okunur
+            sample_width = wav.getsampwidth()
+            if wav.getframerate() == sample_rate and sample_width in RAW_FORMATS:
+                source_channels = wav.getnchannels()
+                wav.setpos(min(wav.getnframes(), int(start_ms * sample_rate / 1000)))
+                while True:
+                    raw = wav.readframes(block_frames)
+                    if not raw:
+                        return
+                    yield _match_channels(_pcm_to_float(raw, source_channels, sample_width), channels)
+                return
+
+    command = [get_encoder_name(), "-v", "quiet"]
+    if start_ms:
+        command += ["-ss", f"{start_ms / 1000:.3f}"]
+    command += ["-i", filepath, "-f", "s16le", "-acodec", "pcm_s16le",
+                "-ac", str(channels), "-ar", str(sample_rate), "-"]
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            raw = process.stdout.read(block_frames * bytes_per_frame)
+            if not raw:
+                break
+            raw = raw[:len(raw) - len(raw) % bytes_per_frame]
+            yield _pcm16_to_float(raw, channels)
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg çözme hatası (çıkış kodu {process.returncode}): {filepath}")
+    finally:
+        process.stdout.close()
+        process.kill()
+        process.wait()
+
+
+def _pcm16_to_float(raw, channels):
+    samples = np.frombuffer(raw, dtype=np.int16).reshape(-1, channels)
+    return samples.astype(np.float32) / 32768.0
+
+
+def _pcm_to_float(raw, channels, sample_width):
+    if sample_width == 2:
+        return _pcm16_to_float(raw, channels)
+    if sample_width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").reshape(-1, channels)
+        return (samples / 2147483648.0).astype(np.float32)
+    # 24 bit: üç baytlık örnekler işaret korunarak 32 bitin üst baytlarına yerleştirilir
+    triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+    samples = np.zeros((len(triplets), 4), dtype=np.uint8)
+    samples[:, 1:] = triplets
+    samples = samples.view("<i4").reshape(-1, channels) >> 8
+    return (samples / 8388608.0).astype(np.float32)
+
+
+def _match_channels(block, channels):
+    if block.shape[1] == channels:
+        return block
+    if block.shape[1] > 1:
+        block = block.mean(axis=1, keepdims=True)
+    return np.repeat(block, channels, axis=1)
+
+
+def float_to_pcm16(block):
+    # _pcm16_to_float'un tam tersi: değişmeyen örnekler birebir geri döner
+    return np.clip(np.round(block * 32768.0), -32768, 32767).astype(np.int16)
+
+
+def float_to_pcm(block, sample_width=2):
+    """float_to_pcm16'nın 24 ve 32 bit karşılıklarını da kapsayan genel hali."""
+    if sample_width == 2:
+        return float_to_pcm16(block)
+    scale = float(1 << (8 * sample_width - 1))
+    # float64 üzerinden ölçeklenir; float32, 32 bitin tepe değerini tam ifade edemez
+    # sosfilt çıktısı C sıralı olmayabilir; bayt görünümü için bitişik dizi gerekir
+    samples = np.clip(np.round(block.astype(np.float64) * scale), -scale, scale - 1).astype("<i4", order="C")
+    if sample_width == 4:
+        return samples
+    return samples.view(np.uint8).reshape(-1, 4)[:, :3]
+
+
+class PcmEncoder:
+    """
+    PCM blokları (float_to_pcm çıktısı) parça parça kodlayıp dosyaya yazar.
+    WAV doğrudan wave modülüyle, verilen örnek genişliğinde yazılır; diğer
+    biçimler ffmpeg'in standart girdisine aktarılır. Böylece bellekte
+    hiçbir zaman tüm şarkı tutulmaz.
+    """
+
+    def __init__(self, output_filepath, sample_rate, channels, export_format="wav", sample_width=2):
+        self._wav = None
+        self._process = None
+        if export_format == "wav":
+            self._wav = wave.open(output_filepath, "wb")
+            self._wav.setnchannels(channels)
+            self._wav.setsampwidth(sample_width)
+            self._wav.setframerate(sample_rate)
+            return
+
+        command = [get_encoder_name(), "-y", "-v", "quiet", "-f", RAW_FORMATS[sample_width],
+                   "-ar", str(sample_rate), "-ac", str(channels), "-i", "-"]
+        codec = DEFAULT_CODECS.get(export_format)
+        if codec:
+            command += ["-acodec", codec]
+        command += ["-f", export_format, output_filepath]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def write(self, pcm):
+        if self._wav is not None:
+            self._wav.writeframes(pcm.tobytes())
+        else:
+            self._process.stdin.write(pcm.tobytes())
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            return
+        self._process.stdin.close()
+        if self._process.wait() != 0:
+            raise RuntimeError(f"ffmpeg kodlama hatası (çıkış kodu {self._process.returncode})")
+
+    def abort(self):
+        if self._wav is not None:
+            self._wav.close()
+        elif self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
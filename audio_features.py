@@ -0,0 +1,289 @@
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from audio_decode import iter_pcm_blocks
+
+ANALYSIS_SAMPLE_RATE = 22050
+FRAME_SIZE = 2048
+HOP_SIZE = 512
+ROLLOFF_PERCENT = 0.85
+MIN_BPM, MAX_BPM = 60, 200
+
+FEATURE_COLUMNS = ("tempo", "centroid_mean", "centroid_std", "rolloff_mean", "loudness_db", "loudness_std")
+CHROMA_COLUMNS = tuple(f"chroma_{i}" for i in range(12))
+FEATURE_NAMES = FEATURE_COLUMNS + CHROMA_COLUMNS
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "muzikcalar", "audio_features.npz")
+
+
+def _chroma_matrix(sample_rate, frame_size):
+    frequencies = np.fft.rfftfreq(frame_size, 1 / sample_rate)
+    matrix = np.zeros((len(frequencies), 12), dtype=np.float32)
+    audible = (frequencies >= 27.5) & (frequencies <= 5000)
+    pitch_class = np.round(12 * np.log2(frequencies[audible] / 440.0)).astype(int) % 12
+    matrix[np.flatnonzero(audible), pitch_class] = 1
+    return matrix
+
+
+class _FeatureAccumulator:
+    """Çerçeve bazlı ölçümleri sabit bellekle (yalnızca toplamlar) biriktirir."""
+
+    def __init__(self, sample_rate=ANALYSIS_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.window = np.hanning(FRAME_SIZE).astype(np.float32)
+        self.frequencies = np.fft.rfftfreq(FRAME_SIZE, 1 / sample_rate).astype(np.float32)
+        self.chroma_matrix = _chroma_matrix(sample_rate, FRAME_SIZE)
+
+        self.leftover = np.zeros(0, dtype=np.float32)
+        self.previous_log_magnitude = None
+        self.frames = 0
+        self.centroid_sum = 0.0
+        self.centroid_sq_sum = 0.0
+        self.rolloff_sum = 0.0
+        self.loudness_sum = 0.0
+        self.loudness_sq_sum = 0.0
+        self.chroma_sum = np.zeros(12)
+        self.onset_envelope = []
+
+    def add(self, samples):
+        buffer = np.concatenate([self.leftover, samples])
+        if len(buffer) < FRAME_SIZE:
+            self.leftover = buffer
+            return
+
+        frames = sliding_window_view(buffer, FRAME_SIZE)[::HOP_SIZE]
+        # Bir sonraki blokta örtüşen çerçeveler için kuyruk saklanır
+        self.leftover = buffer[len(frames) * HOP_SIZE:]
+
+        magnitude = np.abs(np.fft.rfft(frames * self.window, axis=1))
+        power = magnitude ** 2
+        total = magnitude.sum(axis=1) + 1e-10
+
+        centroid = (magnitude @ self.frequencies) / total
+        cumulative = np.cumsum(power, axis=1)
+        rolloff_bins = (cumulative < ROLLOFF_PERCENT * cumulative[:, -1:]).sum(axis=1)
+        rolloff = self.frequencies[np.minimum(rolloff_bins, len(self.frequencies) - 1)]
+        loudness = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        chroma = power @ self.chroma_matrix
+        chroma /= chroma.sum(axis=1, keepdims=True) + 1e-10
+
+        log_magnitude = np.log1p(magnitude)
+        previous = log_magnitude[:-1]
+        if self.previous_log_magnitude is not None:
+            previous = np.vstack([self.previous_log_magnitude, previous])
+            flux = np.maximum(log_magnitude - previous, 0).sum(axis=1)
+        else:
+            flux = np.concatenate([[0.0], np.maximum(log_magnitude[1:] - previous, 0).sum(axis=1)])
+        self.previous_log_magnitude = log_magnitude[-1:]
+
+        self.frames += len(frames)
+        self.centroid_sum += centroid.sum()
+        self.centroid_sq_sum += (centroid ** 2).sum()
+        self.rolloff_sum += rolloff.sum()
+        self.loudness_sum += loudness.sum()
+        self.loudness_sq_sum += (loudness ** 2).sum()
+        self.chroma_sum += chroma.sum(axis=0)
+        self.onset_envelope.append(flux.astype(np.float32))
+
+    def _tempo(self):
+        if not self.onset_envelope:
+            return 0.0
+        envelope = np.concatenate(self.onset_envelope)
+        envelope = envelope - envelope.mean()
+        frames_per_second = self.sample_rate / HOP_SIZE
+        min_lag = int(frames_per_second * 60 / MAX_BPM)
+        max_lag = int(frames_per_second * 60 / MIN_BPM)
+        if len(envelope) <= max_lag:
+            return 0.0
+
+        size = 1 << int(np.ceil(np.log2(2 * len(envelope))))
+        spectrum = np.fft.rfft(envelope, size)
+        autocorrelation = np.fft.irfft(spectrum * np.conj(spectrum), size)[:max_lag + 1]
+        lags = np.arange(min_lag, max_lag + 1)
+        # Oktav hatalarını (yarı/iki kat tempo) azaltmak için 120 BPM çevresi tercih edilir
+        prior = np.exp(-0.5 * np.log2(60 * frames_per_second / lags / 120) ** 2)
+        lag = lags[int(np.argmax(autocorrelation[min_lag:max_lag + 1] * prior))]
+        return 60 * frames_per_second / lag
+
+    def result(self):
+        if self.frames == 0:
+            return None
+        n = self.frames
+        centroid_mean = self.centroid_sum / n
+        loudness_mean = self.loudness_sum / n
+        values = [
+            self._tempo(),
+            centroid_mean,
+            np.sqrt(max(self.centroid_sq_sum / n - centroid_mean ** 2, 0)),
+            self.rolloff_sum / n,
+            loudness_mean,
+            np.sqrt(max(self.loudness_sq_sum / n - loudness_mean ** 2, 0)),
+        ]
+        return np.concatenate([values, self.chroma_sum / n]).astype(np.float32)
+
+
+def extract_features(filepath, block_frames=ANALYSIS_SAMPLE_RATE * 5):
+    """
+    Dosyayı bir kez, parça parça çözerek sayısal tanımlayıcıları çıkarır:
+    tempo, spektral ağırlık merkezi/rolloff, ses yüksekliği ve kroma özeti.
+    Bellek kullanımı şarkı uzunluğundan bağımsızdır (tempo zarfı hariç).
+    """
+    accumulator = _FeatureAccumulator()
+    for block in iter_pcm_blocks(filepath, ANALYSIS_SAMPLE_RATE, 1, block_frames):
+        accumulator.add(block[:, 0])
+    return accumulator.result()
+
+
+def _analyse(filepath):
+    try:
+        return filepath, extract_features(filepath), None
+    except Exception as e:
+        return filepath, None, str(e)
+
+
+class FeatureStore:
+    """
+    Şarkı başına ses tanımlayıcılarını sütun bazlı tutan kalıcı depo.
+    Her özellik ayrı bir dizi olarak .npz içinde saklanır; dosya boyutu ve
+    değişiklik zamanı da tutulduğundan yeniden taramada yalnızca yeni ya da
+    değişen dosyalar analiz edilir.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self.paths = []
+        self.sizes = np.zeros(0, dtype=np.int64)
+        self.mtimes = np.zeros(0, dtype=np.int64)
+        self.values = np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
+        self._row_of = {}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                self.paths = data["path"].tolist()
+                self.sizes = data["size"]
+                self.mtimes = data["mtime_ns"]
+                self.values = np.column_stack([data[name] for name in FEATURE_NAMES]).astype(np.float32)
+            self._row_of = {path: row for row, path in enumerate(self.paths)}
+        except Exception as e:
+            print(f"Ses özellik deposu okunamadı: {e}")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        columns = {name: self.values[:, i] for i, name in enumerate(FEATURE_NAMES)}
+        temp_path = self.path + ".tmp.npz"
+        np.savez(temp_path, path=np.array(self.paths, dtype=str), size=self.sizes, mtime_ns=self.mtimes, **columns)
+        os.replace(temp_path, self.path)
+
+    def get(self, filepath):
+        row = self._row_of.get(_normalize_path(filepath))
+        return None if row is None else self.values[row]
+
+    def is_current(self, filepath, stat):
+        row = self._row_of.get(_normalize_path(filepath))
+        return row is not None and self.sizes[row] == stat.st_size and self.mtimes[row] == stat.st_mtime_ns
+
+    def put_many(self, records):
+        """records: (dosya_yolu, os.stat sonucu, özellik vektörü) üçlüleri."""
+        new_paths, new_sizes, new_mtimes, new_values = [], [], [], []
+        for filepath, stat, values in records:
+            key = _normalize_path(filepath)
+            row = self._row_of.get(key)
+            if row is not None:
+                self.sizes[row] = stat.st_size
+                self.mtimes[row] = stat.st_mtime_ns
+                self.values[row] = values
+                continue
+            self._row_of[key] = len(self.paths) + len(new_paths)
+            new_paths.append(key)
+            new_sizes.append(stat.st_size)
+            new_mtimes.append(stat.st_mtime_ns)
+            new_values.append(values)
+
+        if new_paths:
+            self.paths.extend(new_paths)
+            self.sizes = np.concatenate([self.sizes, np.array(new_sizes, dtype=np.int64)])
+            self.mtimes = np.concatenate([self.mtimes, np.array(new_mtimes, dtype=np.int64)])
+            self.values = np.vstack([self.values, np.array(new_values, dtype=np.float32)])
+
+
+class AnalysisPipeline:
+    """
+    Şarkıları süreç havuzunda paralel analiz eder. Sonuçlar her toplu işten
+    sonra depoya yazılır; yarıda kesilen tarama kaldığı yerden sürer.
+    """
+
+    def __init__(self, store=None, max_workers=None, batch_size=32):
+        self.store = store if store is not None else FeatureStore()
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+
+    def pending(self, filepaths):
+        pending = []
+        for filepath in dict.fromkeys(filepaths):
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                continue
+            if not self.store.is_current(filepath, stat):
+                pending.append((filepath, stat))
+        return pending
+
+    def run(self, filepaths, progress=None):
+        """progress(tamamlanan, toplam) her şarkıdan sonra çağrılır."""
+        pending = self.pending(filepaths)
+        if not pending:
+            return 0
+
+        stats = dict(pending)
+        batch = []
+        done = 0
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as executor:
+            futures = [executor.submit(_analyse, filepath) for filepath, _ in pending]
+            for future in as_completed(futures):
+                filepath, values, error = future.result()
+                done += 1
+                if values is not None:
+                    batch.append((filepath, stats[filepath], values))
+                elif error:
+                    print(f"Analiz edilemedi: {filepath} - {error}")
+
+                if len(batch) >= self.batch_size:
+                    self.store.put_many(batch)
+                    self.store.save()
+                    batch = []
+                if progress:
+                    progress(done, len(pending))
+
+        if batch:
+            self.store.put_many(batch)
+        self.store.save()
+        return done
+
+
+def _normalize_path(filepath):
+    return os.path.normcase(os.path.abspath(filepath))
+
+
+def iter_audio_files(folder, supported_formats=(".mp3", ".wav", ".ogg")):
+    for root, _, files in os.walk(folder):
+        for file in files:
+            if file.lower().endswith(supported_formats):
+                yield os.path.join(root, file)
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "songs"
+    pipeline = AnalysisPipeline()
+    analysed = pipeline.run(list(iter_audio_files(target)),
+                            progress=lambda done, total: print(f"\r{done}/{total} şarkı analiz edildi", end=""))
+    print(f"\nAnaliz tamamlandı: {analysed} yeni ya da değişmiş şarkı işlendi.")
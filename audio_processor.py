@@ -1,68 +1,90 @@
-from pydub import AudioSegment
 from pydub.playback import play
 import os
-import tempfile
+import time
+
+from audio_decode import PcmEncoder, float_to_pcm, iter_pcm_blocks, probe_audio, probe_sample_width
+from dsp import StreamingFilter
+from equalizer import BUILTIN_PRESETS, EqualizerPresets, design_sos
+from render_cache import RenderCache
+from tracing import instant, span, traced
 
 class AudioProcessor:
-    def __init__(self):
-        self.temp_dir = tempfile.gettempdir()
+    def __init__(self, render_cache=None):
+        self.render_cache = render_cache if render_cache is not None else RenderCache()
         self.temp_files = [] 
+        self.presets = EqualizerPresets()
 
-    def _get_temp_filepath(self, original_filename, suffix):
-       
-        name, ext = os.path.splitext(os.path.basename(original_filename))
-        temp_filepath = os.path.join(self.temp_dir, f"{name}_{suffix}{ext}")
-        self.temp_files.append(temp_filepath)
-        return temp_filepath
+    def get_eq_cache_key(self, input_filepath, gains):
+        return self.render_cache.make_key(input_filepath, ["eq"], [float(g) for g in gains])
 
-    def apply_bass_boost(self, input_filepath, output_filepath=None, gain_db=6):
-       
-        try:
-            audio = AudioSegment.from_file(input_filepath)
-            bass_boosted_audio = audio.low_pass_filter(100).apply_gain(gain_db) + audio.high_pass_filter(100)
+    def _render(self, input_filepath, effect_chain, params, render_func, output_filepath=None):
+        """
+        Çıktı yolu verilmemişse sonucu önbellekten döndürür ya da önbelleğe
+        işler. Yarım kalan çıktılar geçici dosya olarak izlenir.
+        """
+        key = None
+        if output_filepath is None:
+            key = self.render_cache.make_key(input_filepath, effect_chain, params)
+            cached_filepath = self.render_cache.get(key)
+            if cached_filepath:
+                instant("render.cache_hit", path=os.path.basename(input_filepath), effects=effect_chain)
+                return cached_filepath
+            output_filepath = self.render_cache.path_for(key, os.path.splitext(input_filepath)[1])
 
-            if output_filepath is None:
-                output_filepath = self._get_temp_filepath(input_filepath, "bass_boosted")
-            
-            bass_boosted_audio.export(output_filepath, format=audio.detect_format())
-            print(f"Bas güçlendirme uygulandı ve kaydedildi: {output_filepath}")
-            return output_filepath
-        except Exception as e:
-            print(f"Bas güçlendirme uygulanırken hata oluştu: {e}")
-            return None
+        partial_filepath = f"{output_filepath}.part"
+        self.temp_files.append(partial_filepath)
+        render_func(partial_filepath, _export_format(output_filepath))
+        os.replace(partial_filepath, output_filepath)
+        self.temp_files.remove(partial_filepath)
 
-    def apply_treble_boost(self, input_filepath, output_filepath=None, gain_db=6):
-    
-        try:
-            audio = AudioSegment.from_file(input_filepath)
-            
-          
-            treble_boosted_audio = audio.high_pass_filter(2000).apply_gain(gain_db) + audio.low_pass_filter(2000)
+        if key is not None:
+            self.render_cache.add(key, output_filepath)
+        return output_filepath
 
-            if output_filepath is None:
-                output_filepath = self._get_temp_filepath(input_filepath, "treble_boosted")
-            
-            treble_boosted_audio.export(output_filepath, format=audio.detect_format())
-            print(f"Tiz güçlendirme uygulandı ve kaydedildi: {output_filepath}")
+    @traced("eq.apply")
+    def apply_eq(self, input_filepath, gains, output_filepath=None, progress=None):
+        """10 bantlık ekolayzırı tek bir vektörel geçişte uygular."""
+        gains = tuple(float(g) for g in gains)
+
+        def render(filepath, export_format):
+            render_eq(input_filepath, gains, filepath, export_format, progress)
+
+        try:
+            output_filepath = self._render(input_filepath, ["eq"], list(gains), render, output_filepath)
+            print(f"Ekolayzır uygulandı ve kaydedildi: {output_filepath}")
             return output_filepath
         except Exception as e:
-            print(f"Tiz güçlendirme uygulanırken hata oluştu: {e}")
+            print(f"Ekolayzır uygulanırken hata oluştu: {e}")
             return None
 
+    def apply_preset(self, input_filepath, preset_name, output_filepath=None, progress=None):
+        return self.apply_eq(input_filepath, self.presets.get_gains(preset_name), output_filepath, progress)
+
+    def apply_bass_boost(self, input_filepath, output_filepath=None, gain_db=6):
+        gains = [g * gain_db / 6 for g in BUILTIN_PRESETS["bass_boost"]]
+        return self.apply_eq(input_filepath, gains, output_filepath)
+
+    def apply_treble_boost(self, input_filepath, output_filepath=None, gain_db=6):
+        gains = [g * gain_db / 6 for g in BUILTIN_PRESETS["treble_boost"]]
+        return self.apply_eq(input_filepath, gains, output_filepath)
+
     def reset_audio(self, input_filepath, output_filepath=None):
-    
-        if output_filepath is None:
-            output_filepath = self._get_temp_filepath(input_filepath, "original")
-        
+
+        def render(filepath, export_format):
+            render_chunked(input_filepath, filepath, export_format)
+
         try:
-            audio = AudioSegment.from_file(input_filepath)
-            audio.export(output_filepath, format=audio.detect_format())
+            output_filepath = self._render(input_filepath, ["original"], [], render, output_filepath)
             print(f"Ses orijinal haline döndürüldü: {output_filepath}")
             return output_filepath
         except Exception as e:
             print(f"Ses orijinal haline döndürülürken hata oluştu: {e}")
             return None
 
+    def get_preset_sos(self, preset_name, sample_rate):
+        """Akış ekolayzırı için ön ayarın önbellekteki SOS katsayılarını döndürür."""
+        return self.presets.get_sos(preset_name, sample_rate)
+
     def clean_temp_files(self):
         
         for filepath in self.temp_files:
@@ -74,12 +96,74 @@ class AudioProcessor:
                 print(f"Geçici dosya silinirken hata: {filepath} - {e}")
         self.temp_files = [] 
 
+
+def render_eq(input_filepath, gains, output_filepath, export_format=None, progress=None):
+    """
+    Ekolayzırı uygulayıp sonucu verilen yola yazar. Arka plan işçileri de
+    bu fonksiyonu doğrudan çağırır; ilerleme 0-1 arası bildirilir.
+    """
+    sample_rate, _, _ = probe_audio(input_filepath)
+    render_chunked(input_filepath, output_filepath, export_format, design_sos(tuple(gains), sample_rate), progress)
+
+
+def render_chunked(input_filepath, output_filepath, export_format=None, sos=None, progress=None,
+                   chunk_seconds=5):
+    """
+    Dosyayı özgün örnekleme hızında parça parça çözer, isteğe bağlı SOS
+    filtresinden geçirir ve kodlayarak yazar. Filtre durumu parçalar arasında
+    taşındığından sınırlarda iz kalmaz; bellek kullanımı şarkı uzunluğundan
+    bağımsızdır. 24/32 bit WAV kaynakları özgün örnek genişliğiyle yazılır.
+    Çözme, filtreleme ve kodlama süreleri eq.render span'ine ayrı ayrı yazılır.
+    """
+    sample_rate, channels, duration = probe_audio(input_filepath)
+    sample_width = probe_sample_width(input_filepath)
+    total_frames = duration * sample_rate if duration else None
+    audio_filter = StreamingFilter(sos, channels=channels)
+    encoder = PcmEncoder(output_filepath, sample_rate, channels, export_format or _export_format(output_filepath),
+                         sample_width)
+    done_frames = 0
+    decode_s = filter_s = encode_s = 0.0
+
+    with span("eq.render", path=os.path.basename(input_filepath)) as trace:
+        try:
+            started = time.perf_counter()
+            for block in iter_pcm_blocks(input_filepath, sample_rate, channels, sample_rate * chunk_seconds):
+                decoded = time.perf_counter()
+                filtered_block = audio_filter.process(block)
+                filtered = time.perf_counter()
+                encoder.write(float_to_pcm(filtered_block, sample_width))
+                encoded = time.perf_counter()
+                decode_s += decoded - started
+                filter_s += filtered - decoded
+                encode_s += encoded - filtered
+                done_frames += len(block)
+                if progress and total_frames:
+                    progress(min(done_frames / total_frames, 0.99))
+                started = time.perf_counter()
+            if not done_frames:
+                # Boş çıktı önbelleğe alınmasın diye .part dosyası atılır
+                raise RuntimeError(f"Dosyadan ses çözülemedi: {input_filepath}")
+            closing = time.perf_counter()
+            encoder.close()
+            encode_s += time.perf_counter() - closing
+        except BaseException:
+            encoder.abort()
+            raise
+        trace.set(frames=done_frames, decode_ms=round(decode_s * 1000, 3),
+                  filter_ms=round(filter_s * 1000, 3), encode_ms=round(encode_s * 1000, 3))
+    if progress:
+        progress(1.0)
+
+
+def _export_format(filepath):
+    return os.path.splitext(filepath)[1].lstrip(".").lower() or "wav"
+
 if __name__ == "__main__":
     
     processor = AudioProcessor()
     test_song_path = os.path.join("songs", "test_song.mp3") 
 
-    if os.path.exists(test_song_path):
+    if not os.path.exists(test_song_path):
         print(f"'{test_song_path}' dosyası bulunamadı. Lütfen songs/ klasörüne bir test şarkısı koyun.")
     else:
         print(f"'{test_song_path}' kullanarak ses işlemciyi test ediyorum.")
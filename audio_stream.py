@@ -0,0 +1,381 @@
+import collections
+import threading
+import time
+
+import numpy as np
+import pygame.mixer
+
+from audio_decode import float_to_pcm16, iter_pcm_blocks
+from dsp import StreamingFilter
+
+
+def _scaled(blocks, gain):
+    """Blokları şarkıya özgü ses yüksekliği kazancıyla çarpar; kazanç 1 ise bloklar olduğu gibi geçer."""
+    if gain == 1.0:
+        return blocks
+
+    def scale():
+        try:
+            for block in blocks:
+                yield block * gain
+        finally:
+            blocks.close()
+    return scale()
+
+
+class _PrefetchedTrack:
+    """Sıradaki şarkının başını arka planda çözerek hazır tutar."""
+
+    def __init__(self, filepath, sample_rate, channels, block_frames, head_frames, gain=1.0):
+        self.filepath = filepath
+        self._blocks = _scaled(iter_pcm_blocks(filepath, sample_rate, channels, block_frames), gain)
+        self._head = []
+        self._head_frames = head_frames
+        self._thread = threading.Thread(target=self._decode_head, daemon=True)
+        self._thread.start()
+
+    def _decode_head(self):
+        frames = 0
+        try:
+            for block in self._blocks:
+                self._head.append(block)
+                frames += len(block)
+                if frames >= self._head_frames:
+                    break
+        except Exception as e:
+            print(f"Sıradaki şarkı önceden çözülemedi: {self.filepath} - {e}")
+
+    def blocks(self):
+        self._thread.join()
+        try:
+            yield from self._head
+            yield from self._blocks
+        finally:
+            self._blocks.close()
+
+    def close(self):
+        self._thread.join()
+        self._blocks.close()
+
+
+class MixerChannelSink:
+    """Blokları pygame mikserinde ayrılmış bir kanala çalan ses çıkışı."""
+
+    def __init__(self):
+        self.sample_rate, _, self.channels = pygame.mixer.get_init()
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+
+    def play(self, pcm):
+        self.channel.play(pygame.mixer.Sound(buffer=pcm.tobytes()))
+
+    def queue(self, pcm):
+        self.channel.queue(pygame.mixer.Sound(buffer=pcm.tobytes()))
+
+    def has_queued(self):
+        return self.channel.get_queue() is not None
+
+    def get_busy(self):
+        return self.channel.get_busy()
+
+    def set_volume(self, volume):
+        self.channel.set_volume(volume)
+
+    def pause(self):
+        self.channel.pause()
+
+    def unpause(self):
+        self.channel.unpause()
+
+    def stop(self):
+        self.channel.stop()
+
+
+class NullSink:
+    """
+    Ses aygıtı olmadan çalışan çıkış. realtime=False iken bloklar anında
+    tüketilir (ölçüm ve testler için); realtime=True iken her blok kendi
+    süresi kadar "çalıyor" sayılır, böylece zamanlama gerçek kanala benzer.
+    """
+
+    def __init__(self, sample_rate=44100, channels=2, realtime=False):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.realtime = realtime
+        self.frames_played = 0
+        self._ends = collections.deque()
+        self._paused_at = None
+
+    def _now(self):
+        return self._paused_at if self._paused_at is not None else time.monotonic()
+
+    def _expire(self):
+        now = self._now()
+        while self._ends and self._ends[0] <= now:
+            self._ends.popleft()
+
+    def _duration(self, pcm):
+        return len(pcm) / self.sample_rate if self.realtime else 0.0
+
+    def play(self, pcm):
+        self._ends.clear()
+        self._ends.append(self._now() + self._duration(pcm))
+        self.frames_played += len(pcm)
+
+    def queue(self, pcm):
+        self._expire()
+        start = self._ends[-1] if self._ends else self._now()
+        self._ends.append(start + self._duration(pcm))
+        self.frames_played += len(pcm)
+
+    def has_queued(self):
+        self._expire()
+        return len(self._ends) > 1
+
+    def get_busy(self):
+        self._expire()
+        return bool(self._ends)
+
+    def set_volume(self, volume):
+        pass
+
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = time.monotonic()
+
+    def unpause(self):
+        if self._paused_at is not None:
+            paused = time.monotonic() - self._paused_at
+            self._ends = collections.deque(end + paused for end in self._ends)
+            self._paused_at = None
+
+    def stop(self):
+        self._ends.clear()
+        self._paused_at = None
+
+
+class StreamingPlayer:
+    """
+    Şarkıyı bloklar halinde çözüp filtreleyerek ayrılmış bir mikser kanalına
+    besler. Ekolayzır değişiklikleri dosya yeniden kodlanmadan, çalan şarkının
+    ortasında bir tampon süresi içinde duyulur. Kuyruğa alınan sıradaki şarkı
+    önceden çözülür ve aynı akışa boşluksuz (isteğe bağlı çapraz geçişle) eklenir.
+    """
+
+    def __init__(self, block_frames=2048, crossfade_ms=0, sink=None):
+        self.block_frames = block_frames
+        self.crossfade_ms = crossfade_ms
+        self.sink = sink if sink is not None else MixerChannelSink()
+        self.sample_rate = self.sink.sample_rate
+        self.channels = self.sink.channels
+        self.filter = StreamingFilter(channels=self.channels)
+
+        self.filepath = None
+        self.gain = 1.0
+        self.is_paused = False
+        self.finished = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._next_track = None
+        self._track_changes = collections.deque()
+        self._start_ms = 0
+        self._played_frames = 0
+        self._playing_frames = 0
+        self._queued_frames = 0
+        self._queued_track_start = None
+        # Ölçüm için: sıradaki şarkının ilk bloğunun ve son EQ değişikliğinin çıkışa ulaştığı an
+        self.track_started_at = None
+        self.eq_latency = None
+        self._sos_changed_at = None
+
+    def set_sos(self, sos):
+        with self._lock:
+            self.filter.set_sos(sos)
+            self._sos_changed_at = time.perf_counter()
+
+    def set_volume(self, volume):
+        self.sink.set_volume(volume)
+
+    def play(self, filepath, start_ms=0, gain=1.0):
+        """gain: şarkıya özgü doğrusal kazanç (ör. ses yüksekliği eşitleme)."""
+        self.stop()
+        self.filepath = filepath
+        self.gain = gain
+        self.is_paused = False
+        self.finished = False
+        self._start_ms = start_ms
+        self._played_frames = 0
+        self._playing_frames = 0
+        self._queued_frames = 0
+        self._queued_track_start = None
+        self.track_started_at = None
+        self._track_changes.clear()
+        self.filter.reset()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._feed, args=(filepath, start_ms, self._stop_event),
+                                        daemon=True)
+        self._thread.start()
+
+    def queue(self, filepath, gain=1.0):
+        """Sıradaki şarkıyı kuyruğa alır ve başını hemen çözmeye başlar."""
+        head_frames = max(self.block_frames * 4, int(self.crossfade_ms * self.sample_rate / 1000))
+        next_track = _PrefetchedTrack(filepath, self.sample_rate, self.channels, self.block_frames, head_frames,
+                                      gain)
+        with self._lock:
+            previous, self._next_track = self._next_track, next_track
+        if previous is not None:
+            previous.close()
+
+    def pop_track_change(self):
+        """Son sorgudan beri kuyruktaki şarkıya geçildiyse o şarkının yolunu döndürür."""
+        filepath = None
+        while self._track_changes:
+            filepath = self._track_changes.popleft()
+        return filepath
+
+    def _take_next_track(self):
+        with self._lock:
+            next_track, self._next_track = self._next_track, None
+        return next_track
+
+    def _iter_sequence(self, filepath, start_ms):
+        """
+        Çalınacak blokları (blok, yeni_şarkı_yolu) olarak üretir. Şarkı bitince
+        kuyruktaki şarkıya geçilir; çapraz geçiş açıksa son kısım tutulur ve
+        sonraki şarkının başıyla eşit güçte karıştırılır.
+        """
+        blocks = _scaled(iter_pcm_blocks(filepath, self.sample_rate, self.channels, self.block_frames, start_ms),
+                         self.gain)
+        track_start = None
+
+        while True:
+            fade_frames = int(self.crossfade_ms * self.sample_rate / 1000)
+            held, held_frames = collections.deque(), 0
+            try:
+                for block in blocks:
+                    if not fade_frames:
+                        yield block, track_start
+                        track_start = None
+                        continue
+                    held.append(block)
+                    held_frames += len(block)
+                    while held and held_frames - len(held[0]) >= fade_frames:
+                        oldest = held.popleft()
+                        held_frames -= len(oldest)
+                        yield oldest, track_start
+                        track_start = None
+            finally:
+                blocks.close()
+
+            tail = np.concatenate(held) if held else None
+            next_track = self._take_next_track()
+            if next_track is None:
+                if tail is not None:
+                    yield tail, track_start
+                return
+
+            blocks = next_track.blocks()
+            track_start = next_track.filepath
+            if tail is None:
+                continue
+
+            head, head_frames = [], 0
+            for block in blocks:
+                head.append(block)
+                head_frames += len(block)
+                if head_frames >= len(tail):
+                    break
+            head = np.concatenate(head) if head else np.zeros((0, self.channels), dtype=np.float32)
+
+            mix_frames = min(len(tail), len(head))
+            ramp = np.linspace(0, np.pi / 2, len(tail), dtype=np.float32)[:, np.newaxis]
+            mixed = tail * np.cos(ramp)
+            mixed[:mix_frames] += head[:mix_frames] * np.sin(ramp[:mix_frames])
+            yield mixed, track_start
+            track_start = None
+            if len(head) > mix_frames:
+                yield head[mix_frames:], None
+
+    def _feed(self, filepath, start_ms, stop_event):
+        sequence = self._iter_sequence(filepath, start_ms)
+        block_seconds = self.block_frames / self.sample_rate
+        try:
+            for block, track_start in sequence:
+                # Kanal kuyruğu doluyken bekle; yalnızca bir blok önde kalınır
+                while self.sink.has_queued() or self.is_paused:
+                    if stop_event.wait(block_seconds / 4):
+                        return
+                if stop_event.is_set():
+                    return
+
+                with self._lock:
+                    block = self.filter.process(block)
+                    sos_changed_at, self._sos_changed_at = self._sos_changed_at, None
+                pcm = float_to_pcm16(block)
+
+                if self.sink.get_busy():
+                    # Kuyruk boşaldıysa önceki kuyruktaki blok çalmaya başlamıştır
+                    self.sink.queue(pcm)
+                    if self._queued_track_start:
+                        self._begin_track(self._queued_track_start)
+                    else:
+                        self._played_frames += self._playing_frames
+                    self._playing_frames, self._queued_frames = self._queued_frames, len(block)
+                    self._queued_track_start = track_start
+                else:
+                    self.sink.play(pcm)
+                    if self.track_started_at is None:
+                        self.track_started_at = time.perf_counter()
+                    if track_start:
+                        self._begin_track(track_start)
+                    else:
+                        self._played_frames += self._playing_frames + self._queued_frames
+                    self._playing_frames, self._queued_frames = len(block), 0
+                    self._queued_track_start = None
+                if sos_changed_at is not None:
+                    self.eq_latency = time.perf_counter() - sos_changed_at
+
+            if self._queued_track_start:
+                self._begin_track(self._queued_track_start)
+            while self.sink.get_busy() and not stop_event.wait(block_seconds / 4):
+                pass
+        except Exception as e:
+            print(f"Akış sırasında hata oluştu: {self.filepath} - {e}")
+        finally:
+            sequence.close()
+            if not stop_event.is_set():
+                self.finished = True
+
+    def _begin_track(self, filepath):
+        self.filepath = filepath
+        self.track_started_at = time.perf_counter()
+        self._start_ms = 0
+        self._played_frames = 0
+        self._track_changes.append(filepath)
+
+    def get_position_ms(self):
+        return self._start_ms + int(self._played_frames * 1000 / self.sample_rate)
+
+    def get_busy(self):
+        return self._thread is not None and not self.finished
+
+    def pause(self):
+        self.is_paused = True
+        self.sink.pause()
+
+    def unpause(self):
+        self.is_paused = False
+        self.sink.unpause()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+        self.sink.stop()
+        self.is_paused = False
+        self.finished = False
+        next_track = self._take_next_track()
+        if next_track is not None:
+            next_track.close()
@@ -0,0 +1,360 @@
+"""
+Sıcak yollar için yeniden üretilebilir ölçüm takımı.
+
+    python benchmark.py --suites eq,recommend,playlist,scan --output sonuclar.json
+    python benchmark.py --suites recommend --sizes 1000,100000,1000000
+    python benchmark.py --compare onceki.json --tolerance 0.25
+
+Tüm veriler sabit tohumla geçici bir klasörde üretilir. Sonuçlar JSON olarak
+yazılır; --compare verilirse süre ve bellek ölçümleri önceki sonuçla
+karşılaştırılır ve tolerans aşıldığında çıkış kodu 1 olur.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from tracing import memory_mb
+
+SUITES = ("eq", "recommend", "playlist", "scan")
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_TRACK_SECONDS = (30, 120, 300)
+GENRES = ("Pop", "Rock", "Caz", "Halk Müziği", "Arabesk", "Elektronik", "Klasik", "Rap", "Etnik Müzik", "Blues")
+# Süre ve bellek ölçümleri: daha büyük değer daha kötü sonuçtur
+LOWER_IS_BETTER_SUFFIXES = ("_s", "_ms", "_mb")
+
+
+def _peak_rss_mb():
+    return memory_mb()[1]
+
+
+def _percentile(values, q):
+    return float(np.percentile(values, q)) if values else None
+
+
+def _in_fresh_process(func, *args):
+    """Ölçümü yeni bir süreçte çalıştırır; tepe bellek kullanımı yalnızca o işe ait olur."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(func, *args).result()
+
+
+# --- Sentetik veri ---------------------------------------------------------
+
+def _words(rng, count, min_len=3, max_len=9):
+    letters = "abcçdefgğhıijklmnoöprsştuüvyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(min_len, max_len))) for _ in range(count)]
+
+
+def generate_catalog(path, n_songs, seed=0):
+    """song_data.json biçiminde n_songs şarkılık sentetik bir katalog yazar."""
+    rng = random.Random(seed)
+    vocabulary = _words(rng, 5000)
+    artists = [" ".join(w.capitalize() for w in rng.sample(vocabulary, 2)) for _ in range(max(10, n_songs // 20))]
+    keywords = _words(rng, 2000)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("[\n")
+        for i in range(n_songs):
+            song = {
+                "title": " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 4))).capitalize(),
+                "artist": rng.choice(artists),
+                "genre": rng.choice(GENRES),
+                "keywords": rng.sample(keywords, rng.randint(2, 6)),
+                "filepath": f"songs/{i:07d}.mp3",
+            }
+            f.write(json.dumps(song, ensure_ascii=False))
+            f.write(",\n" if i < n_songs - 1 else "\n")
+        f.write("]\n")
+
+
+def generate_track(path, seconds, sample_rate=44100, seed=0, sample_width=2):
+    """Gürültü ve sinüslerden oluşan stereo WAV dosyası yazar (varsayılan 16 bit)."""
+    from audio_decode import float_to_pcm
+
+    rng = np.random.default_rng(seed)
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(sample_width)
+        wav_file.setframerate(sample_rate)
+        chunk = sample_rate * 10
+        for start in range(0, seconds * sample_rate, chunk):
+            frames = min(chunk, seconds * sample_rate - start)
+            t = (start + np.arange(frames)) / sample_rate
+            signal = 0.3 * np.sin(2 * np.pi * 110 * t) + 0.1 * rng.standard_normal(frames)
+            if sample_width == 2:
+                pcm = (np.clip(signal, -1, 1) * 32767).astype('<i2')
+                wav_file.writeframes(np.repeat(pcm[:, np.newaxis], 2, axis=1).tobytes())
+            else:
+                stereo = np.repeat(np.clip(signal, -1, 1)[:, np.newaxis], 2, axis=1)
+                wav_file.writeframes(float_to_pcm(stereo, sample_width).tobytes())
+
+
+def generate_tree(root, n_files, files_per_dir=50):
+    for i in range(n_files):
+        directory = os.path.join(root, f"artist{i // (files_per_dir * 10):04d}", f"album{i // files_per_dir:05d}")
+        if i % files_per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{i:07d}.mp3"), 'wb') as f:
+            f.write(b"\0" * 128)
+
+
+# --- Ölçümler --------------------------------------------------------------
+
+def _measure_eq(track_path, output_path):
+    from audio_processor import render_eq
+    from equalizer import BUILTIN_PRESETS
+
+    baseline_mb = _peak_rss_mb()
+    start = time.perf_counter()
+    render_eq(track_path, BUILTIN_PRESETS["bass_boost"], output_path, "wav")
+    with wave.open(track_path, 'rb') as source, wave.open(output_path, 'rb') as output:
+        # Ekolayzır çıktısı kaynağın örnek genişliğini ve uzunluğunu korumalıdır
+        if (output.getsampwidth(), output.getnframes()) != (source.getsampwidth(), source.getnframes()):
+            raise RuntimeError(f"EQ çıktısı kaynakla uyuşmuyor: {output.getsampwidth() * 8} bit, "
+                               f"{output.getnframes()} kare")
+    return {"render_s": time.perf_counter() - start, "peak_rss_mb": _peak_rss_mb(),
+            "rss_growth_mb": None if baseline_mb is None else _peak_rss_mb() - baseline_mb}
+
+
+def bench_eq(workdir, track_seconds):
+    results = []
+    for seconds in track_seconds:
+        track_path = os.path.join(workdir, f"track_{seconds}s.wav")
+        generate_track(track_path, seconds)
+        metrics = _in_fresh_process(_measure_eq, track_path, os.path.join(workdir, "eq_out.wav"))
+        metrics["realtime_factor"] = seconds / metrics["render_s"]
+        results.append({"suite": "eq", "name": "render_eq", "params": {"track_seconds": seconds}, "metrics": metrics})
+        os.remove(track_path)
+
+    # 24 bit kaynak, filtre çıktısının özgün genişlikte yazılabildiğini doğrular
+    seconds = min(track_seconds)
+    track_path = os.path.join(workdir, f"track_{seconds}s_24bit.wav")
+    generate_track(track_path, seconds, sample_width=3)
+    metrics = _in_fresh_process(_measure_eq, track_path, os.path.join(workdir, "eq_out.wav"))
+    metrics["realtime_factor"] = seconds / metrics["render_s"]
+    results.append({"suite": "eq", "name": "render_eq_24bit", "params": {"track_seconds": seconds},
+                    "metrics": metrics})
+    os.remove(track_path)
+    return results
+
+
+def _query_index(index, matrix, rows, k=10):
+    """Her satırı sorgu olarak kullanır (kendisi hariç); (p50 ms, sonuç kümeleri) döndürür."""
+    latencies, found = [], []
+    for row in rows:
+        start = time.perf_counter()
+        indices, _ = index.query(matrix[row], k, exclude=[row])
+        latencies.append((time.perf_counter() - start) * 1000)
+        found.append(set(indices.tolist()))
+    return _percentile(latencies, 50), found
+
+
+def _measure_index_recall(matrix, rows, k=10):
+    """LSH indeksinin gecikmesini tam aramaya göre recall@k ile birlikte ölçer."""
+    from similarity_index import ExactIndex, LSHIndex
+
+    exact_ms, expected = _query_index(ExactIndex(matrix), matrix, rows, k)
+    start = time.perf_counter()
+    lsh = LSHIndex(matrix)
+    build_s = time.perf_counter() - start
+    lsh_ms, found = _query_index(lsh, matrix, rows, k)
+    recall = float(np.mean([len(a & b) / len(b) for a, b in zip(found, expected) if b]))
+    return {"exact_query_p50_ms": exact_ms, "lsh_query_p50_ms": lsh_ms, "lsh_build_s": build_s,
+            f"lsh_recall_at_{k}": recall}
+
+
+def _measure_recommend(catalog_path, cache_dir, queries):
+    from recommendation_engine import RecommendationEngine
+
+    start = time.perf_counter()
+    engine = RecommendationEngine(catalog_path, cache_dir=cache_dir, audio_feature_weight=0)
+    cold_s = time.perf_counter() - start
+    start = time.perf_counter()
+    engine = RecommendationEngine(catalog_path, cache_dir=cache_dir, audio_feature_weight=0)
+    warm_s = time.perf_counter() - start
+
+    rng = random.Random(1)
+    titles = engine.df['title'].tolist()
+    seeds = [rng.choice(titles) for _ in range(queries)]
+    latencies = []
+    for title in seeds:
+        start = time.perf_counter()
+        engine.get_song_recommendations(title, 10)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    seed_lists = [rng.sample(titles, 20) for _ in range(max(1, queries // 10))]
+    start = time.perf_counter()
+    engine.recommend_batch(seed_lists, 10)
+    batch_ms = (time.perf_counter() - start) * 1000 / len(seed_lists)
+
+    index_rows = [rng.randrange(len(titles)) for _ in range(queries)]
+    metrics = {"fit_cold_s": cold_s, "load_warm_s": warm_s, "query_p50_ms": _percentile(latencies, 50),
+               "query_p95_ms": _percentile(latencies, 95), "batch_playlist_ms": batch_ms,
+               "peak_rss_mb": _peak_rss_mb(), "index_backend": engine.similarity_index.kind}
+    metrics.update(_measure_index_recall(engine.tfidf_matrix, index_rows))
+    return metrics
+
+
+def bench_recommend(workdir, sizes, queries=200):
+    results = []
+    for n_songs in sizes:
+        catalog_path = os.path.join(workdir, f"song_data_{n_songs}.json")
+        generate_catalog(catalog_path, n_songs)
+        cache_dir = os.path.join(workdir, f"cache_{n_songs}")
+        metrics = _in_fresh_process(_measure_recommend, catalog_path, cache_dir, queries)
+        results.append({"suite": "recommend", "name": "recommendation_engine", "params": {"songs": n_songs},
+                        "metrics": metrics})
+        os.remove(catalog_path)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def bench_playlist(workdir, sizes):
+    from playlist_io import iter_playlist, save_playlist
+    from playlist_model import PlaylistModel
+
+    results = []
+    for n_songs in sizes:
+        filepaths = [f"/muzik/artist{i // 500:04d}/album{i // 50:05d}/{i:07d}.mp3" for i in range(n_songs)]
+        for ext in ("jsonl", "m3u8", "json"):
+            path = os.path.join(workdir, f"playlist.{ext}")
+            start = time.perf_counter()
+            save_playlist(path, filepaths)
+            save_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            first_entry_s = None
+            model = PlaylistModel()
+            for entry in iter_playlist(path):
+                if first_entry_s is None:
+                    first_entry_s = time.perf_counter() - start
+                model.append(entry["path"])
+            load_s = time.perf_counter() - start
+            results.append({"suite": "playlist", "name": f"playlist_{ext}", "params": {"songs": n_songs},
+                            "metrics": {"save_s": save_s, "load_s": load_s, "first_entry_ms": first_entry_s * 1000,
+                                        "file_mb": os.path.getsize(path) / 1e6}})
+            os.remove(path)
+    return results
+
+
+def _measure_scan(root, db_path):
+    from library_index import LibraryIndex, LibraryScanner
+
+    index = LibraryIndex(db_path)
+    scanner = LibraryScanner(index)
+    start = time.perf_counter()
+    total, changed, _ = scanner.scan(root)
+    cold_s = time.perf_counter() - start
+    start = time.perf_counter()
+    scanner.scan(root)
+    warm_s = time.perf_counter() - start
+    index.close()
+    return {"cold_scan_s": cold_s, "rescan_s": warm_s, "files": total, "indexed": changed,
+            "peak_rss_mb": _peak_rss_mb()}
+
+
+def bench_scan(workdir, sizes):
+    results = []
+    for n_files in sizes:
+        root = os.path.join(workdir, f"library_{n_files}")
+        generate_tree(root, n_files)
+        metrics = _in_fresh_process(_measure_scan, root, os.path.join(workdir, f"library_{n_files}.sqlite3"))
+        results.append({"suite": "scan", "name": "library_scan", "params": {"files": n_files}, "metrics": metrics})
+        shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+# --- Karşılaştırma ---------------------------------------------------------
+
+def _result_key(result):
+    return result["suite"], result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results, baseline, tolerance):
+    """Tolerans oranından fazla kötüleşen ölçümleri listeler."""
+    previous = {_result_key(r): r["metrics"] for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        old_metrics = previous.get(_result_key(result))
+        if not old_metrics:
+            continue
+        for metric, value in result["metrics"].items():
+            old_value = old_metrics.get(metric)
+            if not metric.endswith(LOWER_IS_BETTER_SUFFIXES) or not isinstance(value, (int, float)) \
+                    or not isinstance(old_value, (int, float)) or old_value <= 0:
+                continue
+            if value > old_value * (1 + tolerance):
+                regressions.append({"suite": result["suite"], "name": result["name"], "params": result["params"],
+                                    "metric": metric, "baseline": old_value, "current": value,
+                                    "change": value / old_value - 1})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kaan Müzik Çalar ölçüm takımı")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"Virgülle ayrılmış: {', '.join(SUITES)}")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Katalog/çalma listesi/klasör boyutları (ör. 1000,10000,1000000)")
+    parser.add_argument("--track-seconds", default=",".join(map(str, DEFAULT_TRACK_SECONDS)))
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası (verilmezse standart çıktı)")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="İzin verilen kötüleşme oranı")
+    args = parser.parse_args(argv)
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Bilinmeyen ölçüm grubu: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",")]
+    track_seconds = [int(s) for s in args.track_seconds.split(",")]
+
+    workdir = tempfile.mkdtemp(prefix="muzikcalar_bench_")
+    results = []
+    try:
+        for suite in suites:
+            print(f"Ölçülüyor: {suite}", file=sys.stderr)
+            if suite == "eq":
+                results += bench_eq(workdir, track_seconds)
+            elif suite == "recommend":
+                results += bench_recommend(workdir, sizes, args.queries)
+            elif suite == "playlist":
+                results += bench_playlist(workdir, sizes)
+            elif suite == "scan":
+                results += bench_scan(workdir, sizes)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                 "platform": platform.platform(), "cpu_count": os.cpu_count(), "numpy": np.__version__},
+        "results": results,
+    }
+    exit_code = 0
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+        exit_code = 1 if report["regressions"] else 0
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import json
+
+READ_CHUNK_CHARS = 1 << 20
+
+
+def iter_json_records(path, chunk_chars=READ_CHUNK_CHARS):
+    """
+    Katalog kayıtlarını dosyanın tamamını belleğe almadan tek tek üretir.
+    Dosya bir JSON dizisi ([{...}, {...}]) ya da satır başına bir nesne
+    (JSONL) olabilir; dizi biçimi parça parça okunup ayrıştırılır.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        buffer = f.read(chunk_chars)
+        pos = _skip(buffer, 0, " \t\r\n")
+        if buffer[pos:pos + 1] != "[":
+            # JSONL: her satır bağımsız bir kayıttır
+            f.seek(0)
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+
+        pos += 1
+        while True:
+            pos = _skip(buffer, pos, " \t\r\n,")
+            if pos == len(buffer):
+                more = f.read(chunk_chars)
+                if not more:
+                    raise ValueError(f"Katalog beklenmedik şekilde bitti: {path}")
+                buffer, pos = more, 0
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Kayıt okunan parçanın sonunda yarım kalmış olabilir
+                more = f.read(chunk_chars)
+                if not more:
+                    raise
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield record
+            pos = end
+
+
+def _skip(buffer, pos, characters):
+    while pos < len(buffer) and buffer[pos] in characters:
+        pos += 1
+    return pos
@@ -0,0 +1,117 @@
+import numpy as np
+from scipy.signal import sosfilt, sosfilt_zi
+
+
+def _shelf_coefficients(kind, frequency, gain_db, sample_rate, slope=1.0):
+    """RBJ cookbook raf (shelf) filtresi katsayılarını döndürür."""
+    a = 10 ** (gain_db / 40.0)
+    w0 = 2 * np.pi * frequency / sample_rate
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / 2 * np.sqrt((a + 1 / a) * (1 / slope - 1) + 2)
+    sqrt_a_alpha = 2 * np.sqrt(a) * alpha
+
+    if kind == "low":
+        b0 = a * ((a + 1) - (a - 1) * cos_w0 + sqrt_a_alpha)
+        b1 = 2 * a * ((a - 1) - (a + 1) * cos_w0)
+        b2 = a * ((a + 1) - (a - 1) * cos_w0 - sqrt_a_alpha)
+        a0 = (a + 1) + (a - 1) * cos_w0 + sqrt_a_alpha
+        a1 = -2 * ((a - 1) + (a + 1) * cos_w0)
+        a2 = (a + 1) + (a - 1) * cos_w0 - sqrt_a_alpha
+    else:
+        b0 = a * ((a + 1) + (a - 1) * cos_w0 + sqrt_a_alpha)
+        b1 = -2 * a * ((a - 1) + (a + 1) * cos_w0)
+        b2 = a * ((a + 1) + (a - 1) * cos_w0 - sqrt_a_alpha)
+        a0 = (a + 1) - (a - 1) * cos_w0 + sqrt_a_alpha
+        a1 = 2 * ((a - 1) - (a + 1) * cos_w0)
+        a2 = (a + 1) - (a - 1) * cos_w0 - sqrt_a_alpha
+
+    return np.array([b0, b1, b2, a0, a1, a2]) / a0
+
+
+def low_shelf(frequency, gain_db, sample_rate, slope=1.0):
+    return _shelf_coefficients("low", frequency, gain_db, sample_rate, slope)
+
+
+def high_shelf(frequency, gain_db, sample_rate, slope=1.0):
+    return _shelf_coefficients("high", frequency, gain_db, sample_rate, slope)
+
+
+def peaking(frequency, gain_db, sample_rate, q=1.0):
+    """RBJ cookbook tepe (peaking) filtresi katsayılarını döndürür."""
+    a = 10 ** (gain_db / 40.0)
+    w0 = 2 * np.pi * frequency / sample_rate
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+
+    b0 = 1 + alpha * a
+    b1 = -2 * cos_w0
+    b2 = 1 - alpha * a
+    a0 = 1 + alpha / a
+    a1 = -2 * cos_w0
+    a2 = 1 - alpha / a
+
+    return np.array([b0, b1, b2, a0, a1, a2]) / a0
+
+
+def unity_section():
+    """Sinyali değiştirmeyen biquad bölümü (b0 = a0 = 1, diğerleri 0)."""
+    return np.array([1.0, 0.0, 0.0, 1.0, 0.0, 0.0])
+
+
+def cascade(*sections):
+    """Biquad bölümlerini tek bir (n, 6) SOS dizisinde birleştirir."""
+    if not sections:
+        return None
+    return np.vstack(sections)
+
+
+class StreamingFilter:
+    """
+    PCM bloklarını sırayla filtreler; filtre durumu bloklar arasında taşınır,
+    böylece blok sınırlarında çıtırtı oluşmaz. Katsayılar çalma sırasında
+    değiştirilebilir ve bir sonraki blokta etkinleşir; bölüm sayısı aynı
+    kaldıkça filtre durumu korunur.
+    """
+
+    def __init__(self, sos=None, channels=2):
+        self.channels = channels
+        self.sos = None
+        self.zi = None
+        self._identity = False
+        self._seed_pending = True
+        self.set_sos(sos)
+
+    def set_sos(self, sos):
+        if sos is None:
+            self.sos = None
+            self.zi = None
+            return
+
+        sos = np.asarray(sos, dtype=np.float64)
+        if self.zi is None or self.zi.shape[0] != sos.shape[0]:
+            self.zi = np.zeros((sos.shape[0], 2, self.channels))
+        self.sos = sos
+        self._identity = bool((sos == unity_section()).all())
+
+    def reset(self):
+        """Şarkı başında çağrılır; durum bir sonraki bloğun ilk örneğine oturtulur."""
+        if self.sos is not None:
+            self.zi = np.zeros((self.sos.shape[0], 2, self.channels))
+        self._seed_pending = True
+
+    def process(self, block):
+        """(kare, kanal) şeklindeki float blokları filtreler."""
+        if self.sos is None or len(block) == 0:
+            return block
+
+        if self._seed_pending:
+            # Şarkı başında sessizlikten başlamak yerine sinyalin ilk örneğine oturt
+            self.zi = sosfilt_zi(self.sos)[:, :, np.newaxis] * block[0]
+            self._seed_pending = False
+
+        if self._identity and not self.zi.any():
+            # Tüm bölümler birim ve durum sıfırken çıktı girdinin aynısıdır
+            return block
+
+        filtered, self.zi = sosfilt(self.sos, block, axis=0, zi=self.zi)
+        return filtered
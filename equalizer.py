@@ -0,0 +1,116 @@
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from dsp import cascade, high_shelf, low_shelf, peaking, unity_section
+
+EQ_BANDS = (31, 62, 125, 250, 500, 1000, 2000, 4000, 8000, 16000)
+BAND_Q = 1.41
+
+BUILTIN_PRESETS = {
+    "normal": (0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+    "bass_boost": (6, 6, 5, 3, 1, 0, 0, 0, 0, 0),
+    "treble_boost": (0, 0, 0, 0, 0, 1, 3, 5, 6, 6),
+    "vocal": (-2, -2, -1, 0, 2, 4, 4, 2, 0, -1),
+    "rock": (4, 3, 2, 0, -1, -1, 1, 3, 4, 4),
+}
+
+PRESET_LABELS = {
+    "normal": "Normal",
+    "bass_boost": "Bas Güçlendirme",
+    "treble_boost": "Tiz Güçlendirme",
+    "vocal": "Vokal",
+    "rock": "Rock",
+}
+
+USER_PRESETS_PATH = os.path.join("playlistler", "eq_presets.json")
+
+
+@lru_cache(maxsize=64)
+def design_sos(gains, sample_rate):
+    """
+    10 bandın kazançlarından tek bir kademeli SOS filtresi üretir.
+    Sonuç (kazançlar, örnekleme hızı) çiftine göre önbelleğe alınır.
+    Kazancı sıfır olan bantlar kaskada eklenmez; tüm bantlar düzse None döner.
+    """
+    sections = [section for section in _band_sections(gains, sample_rate) if section is not None]
+    return cascade(*sections)
+
+
+@lru_cache(maxsize=64)
+def design_streaming_sos(gains, sample_rate):
+    """
+    Akış çalar için design_sos: kazancı sıfır bantlar birim bölümle
+    doldurulur, böylece SOS hep 10 bölümlüdür. Kaydırıcı sürüklenirken
+    şekil değişmediğinden StreamingFilter durumunu sıfırlamaz.
+    """
+    return cascade(*(unity_section() if section is None else section
+                     for section in _band_sections(gains, sample_rate)))
+
+
+def _band_sections(gains, sample_rate):
+    """Her bant için biquad bölümü; kazancı sıfır ya da Nyquist üstündeki bantlar için None."""
+    last = len(EQ_BANDS) - 1
+    for i, (frequency, gain_db) in enumerate(zip(EQ_BANDS, gains)):
+        if gain_db == 0 or frequency >= sample_rate / 2:
+            yield None
+        elif i == 0:
+            yield low_shelf(frequency, gain_db, sample_rate)
+        elif i == last:
+            yield high_shelf(frequency, gain_db, sample_rate)
+        else:
+            yield peaking(frequency, gain_db, sample_rate, BAND_Q)
+
+
+class EqualizerPresets:
+    """Yerleşik ve kullanıcı tanımlı ekolayzır ön ayarlarını yönetir."""
+
+    def __init__(self, user_presets_path=USER_PRESETS_PATH):
+        self.user_presets_path = user_presets_path
+        self.user_presets = {}
+        self._load_user_presets()
+
+    def _load_user_presets(self):
+        if not os.path.exists(self.user_presets_path):
+            return
+        try:
+            with open(self.user_presets_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.user_presets = {name: _normalize_gains(gains) for name, gains in data.items()}
+        except Exception as e:
+            print(f"Kullanıcı ekolayzır ön ayarları yüklenirken hata oluştu: {e}")
+            self.user_presets = {}
+
+    def names(self):
+        return list(BUILTIN_PRESETS) + [n for n in self.user_presets if n not in BUILTIN_PRESETS]
+
+    def label(self, name):
+        return PRESET_LABELS.get(name, name)
+
+    def get_gains(self, name):
+        if name in self.user_presets:
+            return self.user_presets[name]
+        return BUILTIN_PRESETS.get(name, BUILTIN_PRESETS["normal"])
+
+    def get_sos(self, name, sample_rate):
+        return design_sos(self.get_gains(name), sample_rate)
+
+    def save_user_preset(self, name, gains):
+        self.user_presets[name] = _normalize_gains(gains)
+        try:
+            os.makedirs(os.path.dirname(self.user_presets_path) or ".", exist_ok=True)
+            with open(self.user_presets_path, 'w', encoding='utf-8') as f:
+                json.dump({n: list(g) for n, g in self.user_presets.items()}, f, indent=4, ensure_ascii=False)
+            return True
+        except Exception as e:
+            print(f"Ekolayzır ön ayarı kaydedilirken hata oluştu: {e}")
+            return False
+
+
+def _normalize_gains(gains):
+    gains = tuple(float(np.clip(g, -12, 12)) for g in gains)
+    if len(gains) != len(EQ_BANDS):
+        raise ValueError(f"{len(EQ_BANDS)} bant kazancı bekleniyordu, {len(gains)} verildi.")
+    return gains
@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import queue
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+
+from audio_processor import render_eq
+
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_eq_job(job_id, input_filepath, gains, output_filepath):
+    # İptal edilip yeniden gönderilen iş eskisi bitmeden başlayabilir; her iş kendi geçici dosyasına yazar
+    partial_filepath = f"{output_filepath}.{job_id}.part"
+    ext = os.path.splitext(output_filepath)[1].lstrip(".").lower() or "wav"
+
+    def progress(fraction):
+        _progress_queue.put((job_id, fraction))
+
+    try:
+        render_eq(input_filepath, gains, partial_filepath, ext, progress)
+        os.replace(partial_filepath, output_filepath)
+    finally:
+        if os.path.exists(partial_filepath):
+            os.remove(partial_filepath)
+    return output_filepath
+
+
+class _Job:
+    __slots__ = ("job_id", "key", "tag", "future", "on_done", "on_progress", "cache_key", "cancelled")
+
+    def __init__(self, job_id, key, tag, cache_key):
+        self.job_id = job_id
+        self.key = key
+        self.tag = tag
+        self.cache_key = cache_key
+        self.future = None
+        self.on_done = []
+        self.on_progress = []
+        self.cancelled = False
+
+
+class EffectJobScheduler:
+    """
+    AudioProcessor efektlerini süreç havuzunda arka planda işler.
+    Aynı parça/efekt için bekleyen iş tekrar gönderilirse yeni iş açılmaz,
+    geri çağırmalar mevcut işe eklenir. Sonuçlar ve ilerleme bildirimleri
+    Tk ana döngüsüne master.after üzerinden iletilir.
+    """
+
+    def __init__(self, master, audio_processor, max_workers=None, poll_ms=100):
+        self.master = master
+        self.audio_processor = audio_processor
+        self.poll_ms = poll_ms
+
+        context = multiprocessing.get_context("spawn")
+        self._progress_queue = context.Queue()
+        self._done_queue = queue.Queue()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=context,
+                                             initializer=_init_worker, initargs=(self._progress_queue,))
+        self._jobs = {}
+        self._jobs_by_key = {}
+        self._next_job_id = 0
+        self._poll_id = None
+
+    def submit_eq(self, input_filepath, gains, output_filepath=None, on_done=None, on_progress=None, tag=None):
+        """
+        Ekolayzır işini kuyruğa alır. Çıktı yolu verilmezse sonuç render
+        önbelleğine yazılır; önbellekte zaten varsa iş hiç başlatılmaz.
+        on_done(çıktı_yolu_ya_da_None) ana iş parçacığında çağrılır.
+        """
+        gains = tuple(float(g) for g in gains)
+        cache_key = None
+        if output_filepath is None:
+            cache_key = self.audio_processor.get_eq_cache_key(input_filepath, gains)
+            cached_filepath = self.audio_processor.render_cache.get(cache_key)
+            if cached_filepath:
+                if on_done:
+                    self.master.after(0, on_done, cached_filepath)
+                return None
+            output_filepath = self.audio_processor.render_cache.path_for(cache_key, os.path.splitext(input_filepath)[1])
+
+        key = (os.path.abspath(input_filepath), gains, os.path.abspath(output_filepath))
+        job = self._jobs_by_key.get(key)
+        if job is None or job.cancelled:
+            job_id = self._next_job_id
+            self._next_job_id += 1
+            job = _Job(job_id, key, tag, cache_key)
+            job.future = self._executor.submit(_run_eq_job, job_id, input_filepath, gains, output_filepath)
+            job.future.add_done_callback(lambda future, job_id=job_id: self._done_queue.put(job_id))
+            self._jobs[job_id] = job
+            self._jobs_by_key[key] = job
+
+        if on_done:
+            job.on_done.append(on_done)
+        if on_progress:
+            job.on_progress.append(on_progress)
+
+        self._ensure_polling()
+        return job.job_id
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job.cancelled = True
+        job.future.cancel()
+        if self._jobs_by_key.get(job.key) is job:
+            del self._jobs_by_key[job.key]
+
+    def cancel_tag(self, tag):
+        """Verilen etiketteki bekleyen ya da çalışan işlerin sonuçlarını düşürür."""
+        for job in list(self._jobs.values()):
+            if job.tag == tag:
+                self.cancel(job.job_id)
+
+    def pending_count(self):
+        return sum(1 for job in self._jobs.values() if not job.cancelled)
+
+    def _ensure_polling(self):
+        if self._poll_id is None:
+            self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+
+        while True:
+            try:
+                job_id, fraction = self._progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            job = self._jobs.get(job_id)
+            if job is not None and not job.cancelled:
+                for callback in job.on_progress:
+                    callback(fraction)
+
+        while True:
+            try:
+                job_id = self._done_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._finish(self._jobs.pop(job_id, None))
+
+        if self._jobs:
+            self._ensure_polling()
+
+    def _finish(self, job):
+        if job is None:
+            return
+        if self._jobs_by_key.get(job.key) is job:
+            del self._jobs_by_key[job.key]
+
+        try:
+            output_filepath = job.future.result()
+            if job.cache_key is not None:
+                # İptal edilmiş olsa bile tamamlanan çıktı önbellekte değerlendirilir
+                self.audio_processor.render_cache.add(job.cache_key, output_filepath)
+        except CancelledError:
+            return
+        except Exception as e:
+            if not job.cancelled:
+                print(f"Arka plan efekt işi başarısız oldu: {e}")
+            output_filepath = None
+
+        if job.cancelled:
+            return
+
+        for callback in job.on_done:
+            callback(output_filepath)
+
+    def shutdown(self):
+        for job_id in list(self._jobs):
+            self.cancel(job_id)
+        if self._poll_id is not None:
+            self.master.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,338 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+import wave
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+SUPPORTED_FORMATS = (".mp3", ".wav", ".ogg")
+DEFAULT_DB_PATH = os.path.join(os.path.expanduser("~"), ".cache", "muzikcalar", "library.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS songs (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    duration REAL,
+    title TEXT,
+    artist TEXT,
+    album TEXT,
+    genre TEXT,
+    scanned_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS songs_folder ON songs (folder);
+CREATE TABLE IF NOT EXISTS loudness (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    loudness REAL,
+    peak REAL NOT NULL
+);
+"""
+
+_COLUMNS = ("path", "folder", "size", "mtime_ns", "duration", "title", "artist", "album", "genre", "scanned_at")
+_TAG_KEYS = {"title": ("title", "TIT2"), "artist": ("artist", "TPE1"), "album": ("album", "TALB"),
+             "genre": ("genre", "TCON")}
+
+
+def _first_tag(tags, keys):
+    for key in keys:
+        value = tags.get(key)
+        if value is None:
+            continue
+        if hasattr(value, "text"):
+            value = value.text
+        if isinstance(value, (list, tuple)):
+            value = value[0] if value else None
+        if value:
+            return str(value)
+    return None
+
+
+def read_metadata(filepath):
+    """Süre ve etiketleri okur; okunamayan alanlar None döner."""
+    metadata = {"duration": None, "title": None, "artist": None, "album": None, "genre": None}
+    try:
+        if mutagen is not None:
+            audio = mutagen.File(filepath)
+            if audio is not None:
+                if audio.info is not None:
+                    metadata["duration"] = float(audio.info.length)
+                tags = audio.tags or {}
+                for name, keys in _TAG_KEYS.items():
+                    metadata[name] = _first_tag(tags, keys)
+        elif filepath.lower().endswith(".wav"):
+            with wave.open(filepath, "rb") as wav_file:
+                metadata["duration"] = wav_file.getnframes() / float(wav_file.getframerate())
+    except Exception:
+        pass
+    return metadata
+
+
+def _scan_directory(directory):
+    """Tek bir klasörü os.scandir ile tarar: (alt klasörler, [(yol, boyut, mtime_ns)])."""
+    subdirectories = []
+    files = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                    elif entry.name.lower().endswith(SUPPORTED_FORMATS) and entry.is_file():
+                        stat = entry.stat()
+                        files.append((entry.path, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+    except OSError as e:
+        print(f"Klasör okunamadı: {directory} - {e}")
+    return subdirectories, files
+
+
+class LibraryIndex:
+    """
+    Şarkıların yol, boyut, değişiklik zamanı, süre ve etiketlerini tutan
+    SQLite tabanlı kalıcı kütüphane dizini. Bağlantı, tarama iş parçacığı ile
+    ana iş parçacığı arasında bir kilitle paylaşılır.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SCHEMA)
+
+    def known_files(self, folder):
+        """Klasör altındaki kayıtlı şarkılar: {yol: (boyut, mtime_ns)}."""
+        prefix = os.path.join(os.path.abspath(folder), "")
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, size, mtime_ns FROM songs WHERE folder = ? OR substr(folder, 1, ?) = ?",
+                (prefix.rstrip(os.sep), len(prefix), prefix)).fetchall()
+        return {row["path"]: (row["size"], row["mtime_ns"]) for row in rows}
+
+    def upsert_many(self, records):
+        """records: read_metadata alanlarını da içeren sözlükler."""
+        if not records:
+            return
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO songs ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                [tuple(record[column] for column in _COLUMNS) for record in records])
+
+    def remove_many(self, paths):
+        if not paths:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM songs WHERE path = ?", [(path,) for path in paths])
+
+    def get(self, path):
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM songs WHERE path = ?", (path,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def songs_in(self, folder):
+        prefix = os.path.join(os.path.abspath(folder), "")
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT * FROM songs WHERE folder = ? OR substr(folder, 1, ?) = ? ORDER BY path",
+                (prefix.rstrip(os.sep), len(prefix), prefix)).fetchall()
+        return [dict(row) for row in rows]
+
+    def missing_loudness(self, paths):
+        """Ses yüksekliği hiç ölçülmemiş ya da ölçümden sonra değişmiş dosyalar."""
+        with self._lock:
+            known = {row["path"]: (row["size"], row["mtime_ns"]) for row in self._connection.execute(
+                "SELECT path, size, mtime_ns FROM loudness")}
+        missing = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if known.get(path) != (stat.st_size, stat.st_mtime_ns):
+                missing.append(path)
+        return missing
+
+    def set_loudness_many(self, records):
+        """records: (yol, bütünleşik yükseklik LUFS ya da sessizse None, tepe) üçlüleri."""
+        rows = []
+        for path, loudness, peak in records:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            rows.append((path, stat.st_size, stat.st_mtime_ns, loudness, peak))
+        if not rows:
+            return
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO loudness (path, size, mtime_ns, loudness, peak) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def get_loudness(self, path):
+        """(yükseklik, tepe) ya da dosya ölçülmemiş/değişmişse None."""
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM loudness WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (row["size"], row["mtime_ns"]):
+            return None
+        return row["loudness"], row["peak"]
+
+    def count(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class LibraryScanner:
+    """
+    Klasör ağacını iş parçacığı havuzunda paralel tarar. Boyutu ve
+    değişiklik zamanı dizindekiyle aynı olan dosyaların etiketleri yeniden
+    okunmaz; bulunan şarkılar toplu halde on_batch'e iletilir ve diskten
+    kaybolan şarkılar dizinden silinir. İptal bayrağı yalnızca nesne
+    oluşturulurken temizlenir; taramadan önce gelen cancel() da geçerlidir,
+    bu yüzden iptal edilen tarayıcı yerine yenisi oluşturulur.
+    """
+
+    def __init__(self, index, max_workers=8, batch_size=500):
+        self.index = index
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def scan(self, folder, on_batch=None):
+        """
+        Taramayı çağıran iş parçacığında yürütür. on_batch(yollar) her toplu
+        işte bir kez çağrılır. Dönen değer: (toplam, yeni ya da değişmiş, silinen).
+        """
+        folder = os.path.abspath(folder)
+        known = self.index.known_files(folder)
+        seen = set()
+        batch = []
+        pending_records = []
+        total = changed = 0
+
+        def flush(force=False):
+            if pending_records and (force or len(pending_records) >= self.batch_size):
+                self.index.upsert_many(pending_records)
+                pending_records.clear()
+            if batch and (force or len(batch) >= self.batch_size):
+                if on_batch:
+                    on_batch(list(batch))
+                batch.clear()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            directory_futures = {executor.submit(_scan_directory, folder)}
+            metadata_futures = set()
+
+            while directory_futures or metadata_futures:
+                done, _ = wait(directory_futures | metadata_futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in directory_futures:
+                        directory_futures.discard(future)
+                        subdirectories, files = future.result()
+                        if self._cancelled.is_set():
+                            continue
+                        for subdirectory in subdirectories:
+                            directory_futures.add(executor.submit(_scan_directory, subdirectory))
+                        for path, size, mtime_ns in files:
+                            seen.add(path)
+                            if known.get(path) == (size, mtime_ns):
+                                total += 1
+                                batch.append(path)
+                            else:
+                                metadata_futures.add(executor.submit(self._describe, path, size, mtime_ns))
+                    else:
+                        metadata_futures.discard(future)
+                        record = future.result()
+                        total += 1
+                        changed += 1
+                        pending_records.append(record)
+                        batch.append(record["path"])
+                flush()
+
+        flush(force=True)
+        if self._cancelled.is_set():
+            return total, changed, 0
+
+        removed = [path for path in known if path not in seen]
+        self.index.remove_many(removed)
+        return total, changed, len(removed)
+
+    @staticmethod
+    def _describe(path, size, mtime_ns):
+        record = {"path": path, "folder": os.path.dirname(path), "size": size, "mtime_ns": mtime_ns,
+                  "scanned_at": time.time()}
+        record.update(read_metadata(path))
+        return record
+
+
+class BackgroundScan:
+    """
+    LibraryScanner'ı ayrı bir iş parçacığında çalıştırır; toplu sonuçları
+    Tk ana döngüsüne master.after ile yoklayarak iletir.
+    """
+
+    def __init__(self, master, scanner, folder, on_batch, on_done, poll_ms=100):
+        self.master = master
+        self.scanner = scanner
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.poll_ms = poll_ms
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(folder,), daemon=True)
+        self._thread.start()
+        self._poll_id = master.after(poll_ms, self._poll)
+
+    def _run(self, folder):
+        try:
+            result = self.scanner.scan(folder, on_batch=lambda paths: self._queue.put(("batch", paths)))
+            self._queue.put(("done", result))
+        except Exception as e:
+            print(f"Kütüphane taraması başarısız oldu: {e}")
+            self._queue.put(("done", None))
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "batch":
+                self.on_batch(payload)
+            else:
+                self.on_done(payload)
+                return
+        self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def cancel(self):
+        self.scanner.cancel()
+        if self._poll_id is not None:
+            self.master.after_cancel(self._poll_id)
+            self._poll_id = None
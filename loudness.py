@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from scipy.signal import sosfilt
+
+from audio_decode import iter_pcm_blocks, probe_audio
+
+LOUDNESS_SAMPLE_RATE = 48000
+TARGET_LUFS = -18.0
+MAX_GAIN_DB = 12.0
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+SEGMENT_FRAMES = LOUDNESS_SAMPLE_RATE // 10
+
+# ITU-R BS.1770 K-ağırlıklandırma filtresi (48 kHz): yüksek raf + RLB yüksek geçiren
+K_WEIGHTING_SOS = np.array([
+    [1.53512485958697, -2.69169618940638, 1.19839281085285, 1.0, -1.69065929318241, 0.73248077421585],
+    [1.0, -2.0, 1.0, 1.0, -1.99004745483398, 0.99007225036621],
+])
+
+
+def _energy_to_lufs(energy):
+    return -0.691 + 10 * np.log10(np.maximum(energy, 1e-12))
+
+
+def measure_loudness(filepath, block_frames=LOUDNESS_SAMPLE_RATE * 5):
+    """
+    Dosyayı parça parça çözerek bütünleşik ses yüksekliğini (LUFS, BS.1770
+    kapılı) ve örnek tepe değerini döndürür. Filtre durumu parçalar arasında
+    taşınır; bellekte yalnızca 100 ms'lik dilimlerin enerjileri tutulur.
+    Mono dosyalar tek kanal olarak ölçülür; ikiye çoğaltılsalar enerji
+    iki kez sayılır ve sonuç 3 dB yüksek çıkardı.
+    """
+    channels = 1 if probe_audio(filepath)[1] == 1 else 2
+    zi = np.zeros((K_WEIGHTING_SOS.shape[0], 2, channels))
+    leftover = np.zeros((0, channels))
+    segment_energies = []
+    peak = 0.0
+
+    for block in iter_pcm_blocks(filepath, LOUDNESS_SAMPLE_RATE, channels, block_frames):
+        peak = max(peak, float(np.abs(block).max(initial=0.0)))
+        filtered, zi = sosfilt(K_WEIGHTING_SOS, block, axis=0, zi=zi)
+        buffer = np.concatenate([leftover, filtered])
+        usable = len(buffer) - len(buffer) % SEGMENT_FRAMES
+        if usable:
+            segments = buffer[:usable].reshape(-1, SEGMENT_FRAMES, channels)
+            # Kanal enerjileri toplanır (mono ve stereo için kanal ağırlıkları 1'dir)
+            segment_energies.append((segments ** 2).mean(axis=1).sum(axis=1))
+        leftover = buffer[usable:]
+
+    if not segment_energies:
+        return None, peak
+    energies = np.concatenate(segment_energies)
+    if len(energies) < 4:
+        return float(_energy_to_lufs(energies.mean())), peak
+
+    # 400 ms'lik bloklar %75 örtüşür: ardışık dört dilimin ortalaması
+    blocks = np.convolve(energies, np.full(4, 0.25), mode="valid")
+    blocks = blocks[_energy_to_lufs(blocks) > ABSOLUTE_GATE_LUFS]
+    if not len(blocks):
+        return None, peak
+    relative_gate = _energy_to_lufs(blocks.mean()) + RELATIVE_GATE_LU
+    gated = blocks[_energy_to_lufs(blocks) > relative_gate]
+    return float(_energy_to_lufs(gated.mean())), peak
+
+
+def replay_gain_db(loudness, peak, target=TARGET_LUFS, headroom_db=0.0):
+    """
+    Şarkıyı hedef yüksekliğe getiren kazanç (dB). Tepe değeri, ek
+    kazançlarla (ör. ekolayzır) birlikte 0 dBFS'yi aşmayacak şekilde sınırlanır.
+    """
+    if loudness is None:
+        return 0.0
+    gain_db = min(target - loudness, MAX_GAIN_DB)
+    if peak:
+        gain_db = min(gain_db, -20 * np.log10(peak) - headroom_db)
+    return float(gain_db)
+
+
+def gain_factor(gain_db):
+    return float(10 ** (gain_db / 20))
+
+
+def track_gain(index, filepath, eq_gains=None, target=TARGET_LUFS):
+    """
+    Dizindeki ölçüme göre şarkının doğrusal çalma kazancı; ölçüm yoksa 1.
+    Ekolayzırın en yüksek bant kazancı tepe sınırında pay olarak ayrılır.
+    """
+    measurement = index.get_loudness(filepath)
+    if measurement is None:
+        return 1.0
+    headroom_db = max(0.0, max(eq_gains)) if eq_gains else 0.0
+    return gain_factor(replay_gain_db(*measurement, target=target, headroom_db=headroom_db))
+
+
+def _analyse(filepath):
+    try:
+        loudness, peak = measure_loudness(filepath)
+        return filepath, loudness, peak, None
+    except Exception as e:
+        return filepath, None, None, str(e)
+
+
+class LoudnessScanner:
+    """
+    Ses yüksekliği henüz ölçülmemiş şarkıları süreç havuzunda analiz eder ve
+    sonuçları toplu halde kütüphane dizinine yazar. Ölçümler dosya boyutu ve
+    değişiklik zamanıyla saklanır; dosya değişince yeniden ölçülür.
+    """
+
+    def __init__(self, index, max_workers=None, batch_size=32):
+        self.index = index
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self, filepaths, progress=None):
+        """progress(tamamlanan, toplam) her şarkıdan sonra çağrılır; analiz edilen şarkı sayısını döndürür."""
+        pending = self.index.missing_loudness([os.path.abspath(f) for f in dict.fromkeys(filepaths)])
+        if not pending:
+            return 0
+
+        batch = []
+        done = 0
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context) as executor:
+            futures = [executor.submit(_analyse, filepath) for filepath in pending]
+            for future in as_completed(futures):
+                if self._cancelled:
+                    for other in futures:
+                        other.cancel()
+                    break
+                filepath, loudness, peak, error = future.result()
+                done += 1
+                if error:
+                    print(f"Ses yüksekliği ölçülemedi: {filepath} - {error}")
+                else:
+                    batch.append((filepath, loudness, peak))
+
+                if len(batch) >= self.batch_size:
+                    self.index.set_loudness_many(batch)
+                    batch = []
+                if progress:
+                    progress(done, len(pending))
+
+        self.index.set_loudness_many(batch)
+        return done
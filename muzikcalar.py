@@ -1,14 +1,46 @@
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
+import pygame
 import pygame.mixer
 import os
-import json
 from recommendation_engine import RecommendationEngine
+from recommendation_service import RecommendationService
 from audio_processor import AudioProcessor
+from audio_features import AnalysisPipeline
+from equalizer import EQ_BANDS, design_sos
+from job_scheduler import EffectJobScheduler
+from library_index import BackgroundScan, LibraryIndex, LibraryScanner
+from loudness import LoudnessScanner, track_gain
+from playlist_io import PLAYLIST_FILETYPES, BackgroundPlaylistLoad, iter_playlist, save_playlist
+from playlist_model import PlaylistModel
+from playlist_view import VirtualListView
+from player_engine import PlayerEngine
+from perf_overlay import PerfOverlay
+import tracing
 import threading
 import time
 
+MUSIC_END_EVENT = pygame.USEREVENT + 1
+CROSSFADE_OPTIONS = ((0, "Boşluksuz"), (2000, "Çapraz Geçiş (2 sn)"), (5000, "Çapraz Geçiş (5 sn)"))
+PREFETCH_BYTES = 512 * 1024
+FAVORITES_PATH = os.path.join("playlistler", "begendiklerim.json")
+
+
+def _prefetch_file_head(filepath):
+    """Dosyanın başını okuyarak işletim sistemi önbelleğine (ör. ağ sürücüsünden) alır."""
+    try:
+        with open(filepath, 'rb') as f:
+            f.read(PREFETCH_BYTES)
+    except OSError:
+        pass
+
+def _read_favorites():
+    try:
+        return [entry["path"] for entry in iter_playlist(FAVORITES_PATH)]
+    except (OSError, ValueError):
+        return []
+
 class MusicPlayerApp:
     def __init__(self, master):
         self.master = master
@@ -17,27 +49,52 @@ class MusicPlayerApp:
         master.resizable(False, False) 
 
         pygame.mixer.init()
+        try:
+            # Şarkı sonu olayları pygame olay kuyruğuna düşer; pencere açmadan yalnızca olay sistemi başlatılır
+            pygame.display.init()
+            pygame.mixer.music.set_endevent(MUSIC_END_EVENT)
+            self.end_events_enabled = True
+        except pygame.error:
+            self.end_events_enabled = False
 
         self.audio_processor = AudioProcessor()
+        # Çalma listesi, şarkı indeksi, ekolayzır ve akış yolu motorda tutulur
+        self.engine = PlayerEngine(presets=self.audio_processor.presets,
+                                   gain_for=lambda filepath, gains: self._track_gain(filepath))
+        self.engine.on("track_started", self._on_engine_track_started)
+        self.engine.on("error", self._on_engine_error)
+        self.effect_scheduler = EffectJobScheduler(master, self.audio_processor)
         self.recommender = RecommendationEngine() 
-        self.current_playlist = []
-        self.current_song_index = -1
+        self.recommendation_service = RecommendationService(master, self.recommender)
+        self.library_index = LibraryIndex()
+        self.library_scan = None
+        self.playlist_load = None
+        self._pending_playlist = None
+        self._analysis_state = None
         self.is_playing = False
         self.is_paused = False
+        self.is_streaming = False
+        self.is_playing_render = False
+        self.eq_preset = "normal"
+        self._music_start_ms = 0
+        self._queued_index = None
+        self._queued_is_render = False
+        self.crossfade_ms = tk.IntVar(value=0)
+        self.perf_overlay = None
+        self.normalize_loudness = tk.BooleanVar(value=True)
+        self.user_volume = 0.5
+        self._mixer_gain = 1.0
+        self._queued_gain = 1.0
+        self._loudness_state = None
 
 
         self.playlist_frame = tk.LabelFrame(master, text="Çalma Listesi", padx=10, pady=10)
         self.playlist_frame.pack(pady=10, padx=10, fill="both", expand=True)
 
-        self.playlist_scrollbar = tk.Scrollbar(self.playlist_frame)
-        self.playlist_scrollbar.pack(side="right", fill="y")
-
-        self.playlist_box = tk.Listbox(self.playlist_frame, bg="white", fg="blue", selectbackground="lightblue", selectforeground="black",
-                                      yscrollcommand=self.playlist_scrollbar.set, height=15)
+        self.playlist_box = VirtualListView(self.playlist_frame, self.current_playlist, bg="white", fg="blue",
+                                            selectbackground="lightblue", selectforeground="black", height=15,
+                                            on_activate=self.play_selected_song)
         self.playlist_box.pack(fill="both", expand=True)
-        self.playlist_scrollbar.config(command=self.playlist_box.yview)
-
-        self.playlist_box.bind("<Double-Button-1>", self.play_selected_song)
 
         self.controls_frame = tk.Frame(master, padx=10, pady=10)
         self.controls_frame.pack(pady=5)
@@ -66,13 +123,17 @@ class MusicPlayerApp:
         self.volume_label = tk.Label(master, text="Ses Seviyesi:")
         self.volume_label.pack()
         self.volume_slider = ttk.Scale(master, from_=0, to=1, orient="horizontal", command=self.set_volume)
-        self.volume_slider.set(0.5) 
-        pygame.mixer.music.set_volume(0.5)
+        self.volume_slider.set(self.user_volume) 
+        self._apply_mixer_volume()
+        self.engine.set_volume(self.user_volume)
         self.volume_slider.pack(pady=5, padx=20, fill="x")
 
         self.now_playing_label = tk.Label(master, text="Şu An Çalan: Yok", bd=1, relief="sunken", anchor="w")
         self.now_playing_label.pack(fill="x", padx=10, pady=5)
 
+        self.status_label = tk.Label(master, text="", anchor="w", fg="gray")
+        self.status_label.pack(fill="x", padx=10)
+
         self.menu_bar = tk.Menu(master)
         master.config(menu=self.menu_bar)
 
@@ -81,14 +142,28 @@ class MusicPlayerApp:
         self.file_menu.add_command(label="Klasörden Şarkı Yükle", command=self.load_songs_from_folder)
         self.file_menu.add_command(label="Çalma Listesini Kaydet", command=self.save_playlist)
         self.file_menu.add_command(label="Çalma Listesini Yükle", command=self.load_playlist)
+        self.file_menu.add_command(label="Ekolayzırla Dışa Aktar...", command=self.export_playlist_with_eq)
+        self.file_menu.add_command(label="Kütüphaneyi Analiz Et", command=self.analyze_library)
+        self.file_menu.add_command(label="Ses Yüksekliğini Analiz Et", command=self.analyze_loudness)
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Çıkış", command=self.on_closing)
 
         self.eq_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.menu_bar.add_cascade(label="Ekolayzır", menu=self.eq_menu)
-        self.eq_menu.add_command(label="Normal", command=lambda: self.apply_eq_preset("normal"))
-        self.eq_menu.add_command(label="Bas Güçlendirme", command=lambda: self.apply_eq_preset("bass_boost"))
-        self.eq_menu.add_command(label="Tiz Güçlendirme", command=lambda: self.apply_eq_preset("treble_boost"))
+        self._build_eq_menu()
+
+        self.transition_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Geçiş", menu=self.transition_menu)
+        for crossfade_ms, label in CROSSFADE_OPTIONS:
+            self.transition_menu.add_radiobutton(label=label, value=crossfade_ms, variable=self.crossfade_ms,
+                                                 command=self._on_crossfade_changed)
+        self.transition_menu.add_separator()
+        self.transition_menu.add_checkbutton(label="Ses Yüksekliğini Eşitle", variable=self.normalize_loudness,
+                                             command=self._on_normalization_changed)
+
+        self.tools_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Araçlar", menu=self.tools_menu)
+        self.tools_menu.add_command(label="Performans Paneli", command=self.open_perf_overlay)
 
         self.recommendation_frame = tk.LabelFrame(master, text="Şarkı Önerileri", padx=10, pady=10)
         self.recommendation_frame.pack(pady=10, padx=10, fill="x")
@@ -99,6 +174,20 @@ class MusicPlayerApp:
         self.rec_entry.pack(side="left", padx=5, fill="x", expand=True)
         self.rec_button = tk.Button(self.recommendation_frame, text="Öneri Al", command=self.get_recommendations)
         self.rec_button.pack(side="left", padx=5)
+        self.rec_playlist_button = tk.Button(self.recommendation_frame, text="Listeden Öner",
+                                             command=self.get_playlist_recommendations)
+        self.rec_playlist_button.pack(side="left", padx=5)
+
+        # Yazarken öneri listesi giriş kutusunun altında açılır
+        self.rec_suggestions = tk.Listbox(master, height=6, activestyle="none")
+        self._suggest_after_id = None
+        self.rec_entry.bind("<KeyRelease>", self._on_rec_entry_key)
+        self.rec_entry.bind("<Return>", lambda event: self.get_recommendations())
+        self.rec_entry.bind("<Down>", self._focus_suggestions)
+        self.rec_entry.bind("<Escape>", lambda event: self._hide_suggestions())
+        self.rec_suggestions.bind("<ButtonRelease-1>", lambda event: self._accept_suggestion())
+        self.rec_suggestions.bind("<Return>", lambda event: self._accept_suggestion())
+        self.rec_suggestions.bind("<Escape>", lambda event: self._hide_suggestions())
 
         self.rec_results_text = tk.Text(master, height=5, wrap="word", state="disabled")
         self.rec_results_text.pack(pady=5, padx=10, fill="x")
@@ -107,29 +196,81 @@ class MusicPlayerApp:
 
         self.check_song_end_event()
 
+    @property
+    def current_playlist(self):
+        return self.engine.playlist
+
+    @current_playlist.setter
+    def current_playlist(self, playlist):
+        self.engine.playlist = playlist
+
+    @property
+    def current_song_index(self):
+        return self.engine.current_index
+
+    @current_song_index.setter
+    def current_song_index(self, index):
+        self.engine.current_index = index
+
+    @property
+    def eq_gains(self):
+        return self.engine.eq_gains
+
     def set_volume(self, val):
        
-        pygame.mixer.music.set_volume(float(val))
+        self.user_volume = float(val)
+        self._apply_mixer_volume()
+        self.engine.set_volume(self.user_volume)
+
+    def _track_gain(self, filepath):
+        """Ses yüksekliği eşitleme açıksa şarkının dizindeki ölçümünden doğrusal kazancı döndürür."""
+        if not self.normalize_loudness.get():
+            return 1.0
+        return track_gain(self.library_index, filepath, self.eq_gains if self._eq_sos() is not None else None)
+
+    def _apply_mixer_volume(self):
+        # Mikser sesi 1'i aşamadığından yükseltme yalnızca kaydırıcı altındaki pay kadar uygulanabilir
+        pygame.mixer.music.set_volume(min(1.0, self.user_volume * self._mixer_gain))
+
+    def _on_normalization_changed(self):
+        if self.is_playing and not self.is_streaming:
+            self._mixer_gain = self._track_gain(self.current_playlist[self.current_song_index])
+            self._apply_mixer_volume()
 
     def load_songs_from_folder(self):
         folder_selected = filedialog.askdirectory()
         if folder_selected:
-            self.current_playlist = []
-            self.playlist_box.delete(0, tk.END) 
-
-            supported_formats = (".mp3", ".wav", ".ogg")
-            for root, _, files in os.walk(folder_selected):
-                for file in files:
-                    if file.lower().endswith(supported_formats):
-                        filepath = os.path.join(root, file)
-                        self.current_playlist.append(filepath)
-                        self.playlist_box.insert(tk.END, os.path.basename(filepath))
-            
-            if self.current_playlist:
-                messagebox.showinfo("Yükleme Tamamlandı", f"{len(self.current_playlist)} adet şarkı yüklendi.")
-                self.current_song_index = -1 
-            else:
-                messagebox.showwarning("Uyarı", "Seçilen klasörde desteklenen formatta şarkı bulunamadı.")
+            if self.library_scan is not None:
+                self.library_scan.cancel()
+            if self.playlist_load is not None:
+                self.playlist_load.cancel()
+                self.playlist_load = None
+                self._pending_playlist = None
+            self.stop_song()
+            self.current_playlist = PlaylistModel()
+            self.playlist_box.set_model(self.current_playlist)
+            self.current_song_index = -1
+            self.status_label.config(text=f"Taranıyor: {folder_selected}")
+
+            # Tarama arka planda yürür; değişmeyen dosyalar kütüphane dizininden gelir
+            scanner = LibraryScanner(self.library_index)
+            self.library_scan = BackgroundScan(self.master, scanner, folder_selected,
+                                               self._on_library_batch, self._on_library_scan_done)
+
+    def _on_library_batch(self, filepaths):
+        self.current_playlist.extend(filepaths)
+        self.playlist_box.refresh()
+        self.status_label.config(text=f"Taranıyor: {len(self.current_playlist)} şarkı bulundu")
+
+    def _on_library_scan_done(self, result):
+        self.library_scan = None
+        if result is not None:
+            total, changed, removed = result
+            self.status_label.config(text=f"Tarama tamamlandı: {total} şarkı ({changed} yeni/değişmiş, {removed} silinmiş)")
+        if self.current_playlist:
+            messagebox.showinfo("Yükleme Tamamlandı", f"{len(self.current_playlist)} adet şarkı yüklendi.")
+        else:
+            messagebox.showwarning("Uyarı", "Seçilen klasörde desteklenen formatta şarkı bulunamadı.")
 
     def play_song(self):
         if not self.current_playlist:
@@ -137,7 +278,7 @@ class MusicPlayerApp:
             return
 
         if self.is_paused:
-            pygame.mixer.music.unpause()
+            self._unpause_playback()
             self.is_playing = True
             self.is_paused = False
             self.now_playing_label.config(text=f"Şu An Çalan: {os.path.basename(self.current_playlist[self.current_song_index])}")
@@ -156,17 +297,50 @@ class MusicPlayerApp:
                 messagebox.showwarning("Uyarı", "Çalma listesinde çalacak şarkı yok.")
 
 
-    def _load_and_play_song(self, filepath):
-        try:
-            pygame.mixer.music.load(filepath)
-            pygame.mixer.music.play()
-            self.now_playing_label.config(text=f"Şu An Çalan: {os.path.basename(filepath)}")
-        except pygame.error as e:
-            messagebox.showerror("Çalma Hatası", f"Şarkı çalınamadı: {os.path.basename(filepath)}\n{e}")
-            self.stop_song() 
-        except Exception as e:
-            messagebox.showerror("Hata", f"Beklenmedik bir hata oluştu: {e}")
-            self.stop_song()
+    def _load_and_play_song(self, filepath, start_ms=0):
+        with tracing.span("player.load_and_play", path=os.path.basename(filepath)) as trace:
+            try:
+                rendered_filepath = None
+                eq_active = self._eq_sos() is not None
+                if eq_active:
+                    cache_key = self.audio_processor.get_eq_cache_key(filepath, self.eq_gains)
+                    rendered_filepath = self.audio_processor.render_cache.get(cache_key)
+
+                if (eq_active and rendered_filepath is None) or self.crossfade_ms.get():
+                    # Ekolayzır ya da çapraz geçiş etkinken şarkı, blok bazlı akış yolundan çalınır
+                    pygame.mixer.music.stop()
+                    self.engine.set_crossfade(self.crossfade_ms.get())
+                    with tracing.span("player.stream_start"):
+                        if not self.engine.play(self.current_song_index, start_ms=start_ms):
+                            return
+                    # Sıradaki şarkıyı motor kuyruğa alır; ön işleme şarkı çıkışa ulaşınca başlar
+                    self.is_streaming = True
+                else:
+                    # Önceden işlenmiş bir çıktı varsa DSP maliyeti olmadan doğrudan çalınır
+                    self.engine.stop()
+                    self.is_streaming = False
+                    with tracing.span("player.mixer_load"):
+                        pygame.mixer.music.load(rendered_filepath or filepath)
+                    self._mixer_gain = self._track_gain(filepath)
+                    self._apply_mixer_volume()
+                    if start_ms:
+                        pygame.mixer.music.play(start=start_ms / 1000)
+                    else:
+                        pygame.mixer.music.play()
+                    self._music_start_ms = start_ms
+                    self._queue_next_song()
+                    self._prerender_next_song()
+                # Önceki şarkının durdurulmasıyla oluşan şarkı sonu olayları geçersizdir
+                self._clear_end_events()
+                self.is_playing_render = rendered_filepath is not None
+                trace.set(mode="stream" if self.is_streaming else "render" if self.is_playing_render else "mixer")
+                self.now_playing_label.config(text=f"Şu An Çalan: {os.path.basename(filepath)}")
+            except pygame.error as e:
+                messagebox.showerror("Çalma Hatası", f"Şarkı çalınamadı: {os.path.basename(filepath)}\n{e}")
+                self.stop_song() 
+            except Exception as e:
+                messagebox.showerror("Hata", f"Beklenmedik bir hata oluştu: {e}")
+                self.stop_song()
 
     def play_selected_song(self, event=None):
         if not self.playlist_box.curselection():
@@ -178,19 +352,45 @@ class MusicPlayerApp:
 
     def pause_song(self):
         if self.is_playing:
-            pygame.mixer.music.pause()
+            self._pause_playback()
             self.is_paused = True
             self.is_playing = False
             self.now_playing_label.config(text=f"Şu An Çalan: {os.path.basename(self.current_playlist[self.current_song_index])} (Duraklatıldı)")
         elif self.is_paused:
-            pygame.mixer.music.unpause()
+            self._unpause_playback()
             self.is_playing = True
             self.is_paused = False
             self.now_playing_label.config(text=f"Şu An Çalan: {os.path.basename(self.current_playlist[self.current_song_index])}")
 
 
+    def _pause_playback(self):
+        if self.is_streaming:
+            self.engine.pause()
+        else:
+            pygame.mixer.music.pause()
+
+    def _unpause_playback(self):
+        if self.is_streaming:
+            self.engine.resume()
+        else:
+            pygame.mixer.music.unpause()
+
+    def _is_playback_busy(self):
+        if self.is_streaming:
+            return self.engine.player.get_busy()
+        return pygame.mixer.music.get_busy()
+
+    def _get_position_ms(self):
+        if self.is_streaming:
+            return self.engine.player.get_position_ms()
+        return self._music_start_ms + max(0, pygame.mixer.music.get_pos())
+
     def stop_song(self):
         pygame.mixer.music.stop()
+        self.engine.stop()
+        self._clear_end_events()
+        self.is_streaming = False
+        self._queued_index = None
         self.is_playing = False
         self.is_paused = False
         self.now_playing_label.config(text="Şu An Çalan: Yok")
@@ -203,9 +403,7 @@ class MusicPlayerApp:
         self._load_and_play_song(self.current_playlist[self.current_song_index])
         self.is_playing = True
         self.is_paused = False
-        self.playlist_box.selection_clear(0, tk.END)
-        self.playlist_box.selection_set(self.current_song_index)
-        self.playlist_box.see(self.current_song_index)
+        self._select_current_song()
 
     def play_previous(self):
         if not self.current_playlist:
@@ -214,85 +412,350 @@ class MusicPlayerApp:
         self._load_and_play_song(self.current_playlist[self.current_song_index])
         self.is_playing = True
         self.is_paused = False
+        self._select_current_song()
+
+    def _select_current_song(self):
         self.playlist_box.selection_clear(0, tk.END)
         self.playlist_box.selection_set(self.current_song_index)
         self.playlist_box.see(self.current_song_index)
 
+    def _playable_without_dsp(self, filepath):
+        """Şarkı akış DSP'si olmadan mikserle çalınabiliyorsa çalınacak dosyayı döndürür."""
+        if self.crossfade_ms.get():
+            return None
+        if self._eq_sos() is None:
+            return filepath
+        return self.audio_processor.render_cache.get(self.audio_processor.get_eq_cache_key(filepath, self.eq_gains))
+
+    def _queue_next_song(self):
+        """
+        Mikserle çalarken sıradaki şarkıyı boşluksuz geçiş için pygame
+        kuyruğuna alır. Akış yolunda kuyruğu PlayerEngine yönetir.
+        """
+        self._queued_index = None
+        if not self.current_playlist:
+            return
+
+        next_index = (self.current_song_index + 1) % len(self.current_playlist)
+        next_filepath = self.current_playlist[next_index]
+        playable_filepath = self._playable_without_dsp(next_filepath)
+        if playable_filepath is None or not self.end_events_enabled:
+            return
+        threading.Thread(target=_prefetch_file_head, args=(playable_filepath,), daemon=True).start()
+        pygame.mixer.music.queue(playable_filepath)
+        self._queued_index = next_index
+        self._queued_gain = self._track_gain(next_filepath)
+        self._queued_is_render = playable_filepath != next_filepath
+
+    def _on_queued_song_started(self):
+        if not self.is_streaming:
+            # Akış yolunda indeksi ve sıradaki şarkının kuyruğunu motor günceller
+            self.current_song_index = self._queued_index
+            # pygame, kuyruktaki şarkı başlayınca get_pos sayacını sıfırlar
+            self._music_start_ms = 0
+            self.is_playing_render = self._queued_is_render
+            self._mixer_gain = self._queued_gain
+            self._apply_mixer_volume()
+            self._queue_next_song()
+        self.now_playing_label.config(text=f"Şu An Çalan: {os.path.basename(self.current_playlist[self.current_song_index])}")
+        self._select_current_song()
+        self._prerender_next_song()
+
+    def _on_engine_track_started(self, index, filepath, latency_ms):
+        if latency_ms is None:
+            # Motor kuyruktaki şarkıya boşluksuz geçti
+            self._end_transition(gapless=True)
+            return
+        # Yeni başlatılan (ya da liste sonunda motorun ilerlettiği) şarkının ilk bloğu çıkışa ulaştı
+        if self.is_playing:
+            self.now_playing_label.config(text=f"Şu An Çalan: {os.path.basename(filepath)}")
+            self._select_current_song()
+        self._prerender_next_song()
+
+    def _on_engine_error(self, message):
+        messagebox.showerror("Çalma Hatası", message)
+        self.stop_song()
+
+    def _on_crossfade_changed(self):
+        if self.is_streaming:
+            self.engine.set_crossfade(self.crossfade_ms.get())
+
+    def _clear_end_events(self):
+        if self.end_events_enabled:
+            pygame.event.clear(MUSIC_END_EVENT)
+
+    def _end_transition(self, gapless):
+        """Şarkı sonunda bir sonraki şarkıya geçer; geçiş süresi izlemeye kaydedilir."""
+        with tracing.span("player.end_transition", gapless=gapless, streaming=self.is_streaming):
+            if gapless:
+                self._on_queued_song_started()
+            else:
+                self.play_next()
+
     def check_song_end_event(self):
-        if self.is_playing and not pygame.mixer.music.get_busy() and not self.is_paused:
-            self.play_next()
-        self.master.after(1000, self.check_song_end_event) 
+        if self.is_streaming:
+            # Geçişler ve şarkı sonları motorun olaylarıyla (_on_engine_track_started) işlenir
+            self.engine.poll()
+        elif self.end_events_enabled:
+            for _ in pygame.event.get(MUSIC_END_EVENT):
+                if not self.is_playing:
+                    continue
+                if self._queued_index is not None:
+                    self._end_transition(gapless=True)
+                else:
+                    self._end_transition(gapless=False)
+        elif self.is_playing and not self._is_playback_busy() and not self.is_paused:
+            self._end_transition(gapless=False)
+        self.master.after(50 if self.end_events_enabled or self.is_streaming else 1000, self.check_song_end_event)
 
     def save_playlist(self):
         if not self.current_playlist:
             messagebox.showwarning("Uyarı", "Kaydedilecek bir çalma listesi yok.")
             return
 
-        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Dosyaları", "*.json"), ("Tüm Dosyalar", "*.*")],
+        file_path = filedialog.asksaveasfilename(defaultextension=".jsonl", filetypes=PLAYLIST_FILETYPES,
                                                  initialdir="./playlists")
         if file_path:
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(self.current_playlist, f, indent=4)
+                save_playlist(file_path, self.current_playlist, metadata=self.library_index.get)
                 messagebox.showinfo("Kaydedildi", "Çalma listesi başarıyla kaydedildi.")
             except Exception as e:
                 messagebox.showerror("Hata", f"Çalma listesi kaydedilirken hata oluştu: {e}")
 
     def load_playlist(self):
-        file_path = filedialog.askopenfilename(defaultextension=".json", filetypes=[("JSON Dosyaları", "*.json"), ("Tüm Dosyalar", "*.*")],
-                                               initialdir="./playlists") 
+        file_path = filedialog.askopenfilename(defaultextension=".jsonl", filetypes=PLAYLIST_FILETYPES,
+                                               initialdir="./playlists")
         if file_path:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    loaded_playlist = json.load(f)
-                
-                valid_songs = [s for s in loaded_playlist if os.path.exists(s)]
-                
-                if not valid_songs:
-                    messagebox.showwarning("Uyarı", "Yüklenen çalma listesinde geçerli şarkı bulunamadı veya dosyalar mevcut değil.")
-                    return
-
-                self.current_playlist = valid_songs
-                self.playlist_box.delete(0, tk.END)
-                for song_path in self.current_playlist:
-                    self.playlist_box.insert(tk.END, os.path.basename(song_path))
-                
-                messagebox.showinfo("Yüklendi", "Çalma listesi başarıyla yüklendi.")
-                self.current_song_index = -1
-                self.stop_song() 
+            if self.playlist_load is not None:
+                self.playlist_load.cancel()
+            # Yeni liste ayrı bir modele okunur; mevcut liste ve çalma ilk geçerli şarkılar gelene kadar korunur
+            self._pending_playlist = PlaylistModel()
+            self.status_label.config(text=f"Yükleniyor: {os.path.basename(file_path)}")
+
+            # Liste akış olarak okunur; ilk şarkılar geri kalanı doğrulanmadan çalınabilir
+            self.playlist_load = BackgroundPlaylistLoad(self.master, file_path, self._on_playlist_batch,
+                                                        self._on_playlist_loaded)
+
+    def _on_playlist_batch(self, entries):
+        playlist = self._pending_playlist
+        playlist.extend(entry["path"] for entry in entries)
+        if playlist is not self.current_playlist:
+            # İlk geçerli toplu iş geldi: eski liste ancak şimdi bırakılır
+            if self.library_scan is not None:
+                self.library_scan.cancel()
+                self.library_scan = None
+            self.stop_song()
+            self.current_playlist = playlist
+            self.playlist_box.set_model(playlist)
+            self.current_song_index = -1
+        self.playlist_box.refresh()
+        self.status_label.config(text=f"Yükleniyor: {len(playlist)} şarkı")
+
+    def _on_playlist_loaded(self, valid, missing, error):
+        self.playlist_load = None
+        replaced = self._pending_playlist is self.current_playlist
+        self._pending_playlist = None
+        if error is not None:
+            self.status_label.config(text=f"Çalma listesi yarıda kaldı: {valid} şarkı yüklendi" if replaced else "")
+            messagebox.showerror("Hata", f"Çalma listesi yüklenirken hata oluştu: {error}")
+        elif not valid:
+            self.status_label.config(text="")
+            messagebox.showwarning("Uyarı", "Yüklenen çalma listesinde geçerli şarkı bulunamadı veya dosyalar mevcut değil.")
+        else:
+            note = f", {missing} eksik dosya atlandı" if missing else ""
+            self.status_label.config(text=f"Çalma listesi yüklendi: {valid} şarkı{note}")
 
-            except Exception as e:
-                messagebox.showerror("Hata", f"Çalma listesi yüklenirken hata oluştu: {e}")
+    def _build_eq_menu(self):
+        presets = self.audio_processor.presets
+        self.eq_menu.delete(0, tk.END)
+        for name in presets.names():
+            self.eq_menu.add_command(label=presets.label(name), command=lambda n=name: self.apply_eq_preset(n))
+        self.eq_menu.add_separator()
+        self.eq_menu.add_command(label="Özel Ekolayzır...", command=self.open_custom_eq)
 
     def apply_eq_preset(self, preset_name):
-        if not self.current_playlist or self.current_song_index == -1:
-            messagebox.showwarning("Uyarı", "Lütfen önce çalacak bir şarkı seçin veya bir şarkı çalın.")
+        self.eq_preset = preset_name
+        self._set_eq_gains(self.audio_processor.presets.get_gains(preset_name))
+        if self.is_playing or self.is_paused:
+            self._prerender_next_song()
+
+    def _eq_sos(self):
+        return design_sos(tuple(self.eq_gains), self.engine.player.sample_rate)
+
+    def _set_eq_gains(self, gains):
+        self.engine.set_eq(gains)
+        sos = self._eq_sos()
+
+        if self.current_song_index == -1 or not (self.is_playing or self.is_paused):
             return
 
-        current_filepath = self.current_playlist[self.current_song_index]
-        modified_filepath = None
+        if self.is_streaming or (sos is None and not self.is_playing_render):
+            # Akış zaten çalıyorsa yeni katsayılar bir sonraki blokta devreye girer
+            return
 
-        messagebox.showinfo("Ekolayzır", f"{preset_name.replace('_', ' ').capitalize()} efekti uygulanıyor...")
-        self.stop_song() 
+        position_ms = self._get_position_ms()
+        self._load_and_play_song(self.current_playlist[self.current_song_index], start_ms=position_ms)
+        if self.is_paused:
+            self._pause_playback()
 
-        if preset_name == "normal":
-            modified_filepath = self.audio_processor.reset_audio(current_filepath)
-        elif preset_name == "bass_boost":
-            modified_filepath = self.audio_processor.apply_bass_boost(current_filepath)
-        elif preset_name == "treble_boost":
-            modified_filepath = self.audio_processor.apply_treble_boost(current_filepath)
-        
-        if modified_filepath:
-            self.current_playlist[self.current_song_index] = modified_filepath
-            self._load_and_play_song(modified_filepath)
-            self.is_playing = True
-            self.is_paused = False
-            messagebox.showinfo("Ekolayzır", "Efekt başarıyla uygulandı!")
-        else:
-            messagebox.showerror("Ekolayzır Hatası", "Efekt uygulanırken bir sorun oluştu.")
-        
+    def _prerender_next_song(self):
+        """Ekolayzır etkinse sıradaki şarkıyı arka planda önbelleğe işler."""
+        self.effect_scheduler.cancel_tag("prerender")
+        if self._eq_sos() is None or len(self.current_playlist) < 2:
+            return
+        next_index = (self.current_song_index + 1) % len(self.current_playlist)
+        self.effect_scheduler.submit_eq(self.current_playlist[next_index], self.eq_gains,
+                                        on_done=self._on_next_song_rendered, tag="prerender")
+
+    def _on_next_song_rendered(self, rendered_filepath):
+        # Mikserle çalarken sıradaki şarkı henüz kuyruğa alınamamışsa şimdi alınır
+        if rendered_filepath and not self.is_streaming and self._queued_index is None \
+                and (self.is_playing or self.is_paused):
+            self._queue_next_song()
+
+    def export_playlist_with_eq(self):
+        if not self.current_playlist:
+            messagebox.showwarning("Uyarı", "Dışa aktarılacak bir çalma listesi yok.")
+            return
+
+        output_dir = filedialog.askdirectory()
+        if not output_dir:
+            return
+
+        total = len(self.current_playlist)
+        finished = {"ok": 0, "failed": 0}
+
+        def on_done(output_filepath):
+            finished["ok" if output_filepath else "failed"] += 1
+            done = finished["ok"] + finished["failed"]
+            self.status_label.config(text=f"Dışa aktarılıyor: {done}/{total}")
+            if done == total:
+                self.status_label.config(text=f"Dışa aktarma tamamlandı: {finished['ok']} başarılı, "
+                                              f"{finished['failed']} başarısız.")
+
+        def on_progress(filepath):
+            return lambda fraction: self.status_label.config(
+                text=f"İşleniyor: {os.path.basename(filepath)} (%{int(fraction * 100)})")
+
+        self.effect_scheduler.cancel_tag("export")
+        used_names = set()
+        for filepath in self.current_playlist:
+            output_filepath = self._unique_export_path(output_dir, filepath, used_names)
+            self.effect_scheduler.submit_eq(filepath, self.eq_gains, output_filepath=output_filepath,
+                                            on_done=on_done, on_progress=on_progress(filepath), tag="export")
+        self.status_label.config(text=f"Dışa aktarılıyor: 0/{total}")
+
+    @staticmethod
+    def _unique_export_path(output_dir, filepath, used_names):
+        """
+        Farklı klasörlerdeki aynı adlı şarkılar birbirinin üzerine yazılmasın
+        diye ada " (2)", " (3)"... eklenir; kaynak dosyanın kendisi de atlanır.
+        """
+        stem, ext = os.path.splitext(os.path.basename(filepath))
+        name = stem + ext
+        counter = 1
+        while (os.path.normcase(name) in used_names
+               or os.path.abspath(os.path.join(output_dir, name)) == os.path.abspath(filepath)):
+            counter += 1
+            name = f"{stem} ({counter}){ext}"
+        used_names.add(os.path.normcase(name))
+        return os.path.join(output_dir, name)
+
+    def open_custom_eq(self):
+        window = tk.Toplevel(self.master)
+        window.title("Özel Ekolayzır")
+        window.resizable(False, False)
+
+        bands_frame = tk.Frame(window, padx=10, pady=10)
+        bands_frame.pack()
+
+        sliders = []
+        start_gains = self.eq_gains
+
+        def on_change(_=None):
+            gains = tuple(round(slider.get(), 1) for slider in sliders)
+            self.eq_preset = None
+            self._set_eq_gains(gains)
+
+        for column, (frequency, gain_db) in enumerate(zip(EQ_BANDS, start_gains)):
+            label = f"{frequency // 1000}k" if frequency >= 1000 else str(frequency)
+            slider = ttk.Scale(bands_frame, from_=12, to=-12, orient="vertical", length=150)
+            slider.set(gain_db)
+            slider.config(command=on_change)
+            slider.grid(row=0, column=column, padx=3)
+            tk.Label(bands_frame, text=label).grid(row=1, column=column)
+            sliders.append(slider)
+
+        save_frame = tk.Frame(window, padx=10, pady=5)
+        save_frame.pack(fill="x")
+        tk.Label(save_frame, text="Ön ayar adı:").pack(side="left")
+        name_entry = tk.Entry(save_frame, width=20)
+        name_entry.pack(side="left", padx=5, fill="x", expand=True)
+
+        def save():
+            name = name_entry.get().strip()
+            if not name:
+                messagebox.showwarning("Uyarı", "Lütfen ön ayar için bir ad girin.", parent=window)
+                return
+            gains = [round(slider.get(), 1) for slider in sliders]
+            if self.audio_processor.presets.save_user_preset(name, gains):
+                self.eq_preset = name
+                self._build_eq_menu()
+                messagebox.showinfo("Ekolayzır", f"'{name}' ön ayarı kaydedildi.", parent=window)
+            else:
+                messagebox.showerror("Hata", "Ön ayar kaydedilemedi.", parent=window)
+
+        tk.Button(save_frame, text="Kaydet", command=save).pack(side="left", padx=5)
+
+    def _on_rec_entry_key(self, event):
+        if event.keysym in ("Return", "Down", "Up", "Escape"):
+            return
+        if self._suggest_after_id is not None:
+            self.master.after_cancel(self._suggest_after_id)
+        self._suggest_after_id = self.master.after(120, self._update_suggestions)
+        # Girdi değiştiyse önceki öneri isteğinin sonucu artık geçersizdir
+        self.recommendation_service.supersede()
+
+    def _update_suggestions(self):
+        self._suggest_after_id = None
+        suggestions = self.recommender.search_titles(self.rec_entry.get(), limit=6)
+        if not suggestions:
+            self._hide_suggestions()
+            return
+        self.rec_suggestions.delete(0, tk.END)
+        self.rec_suggestions.insert(tk.END, *(f"{title} — {artist}" for title, artist in suggestions))
+        self._suggested_titles = [title for title, _ in suggestions]
+        self.rec_suggestions.config(height=len(suggestions))
+        self.rec_suggestions.place(in_=self.rec_entry, relx=0, rely=1, relwidth=1)
+        self.rec_suggestions.lift()
+
+    def _focus_suggestions(self, event=None):
+        if self.rec_suggestions.winfo_ismapped():
+            self.rec_suggestions.focus_set()
+            self.rec_suggestions.selection_clear(0, tk.END)
+            self.rec_suggestions.selection_set(0)
+            self.rec_suggestions.activate(0)
+
+    def _accept_suggestion(self):
+        """Seçili öneriyi giriş kutusuna yazar; seçim yoksa False döner."""
+        selection = self.rec_suggestions.curselection() if self.rec_suggestions.winfo_ismapped() else ()
+        if not selection:
+            self._hide_suggestions()
+            return False
+        self.rec_entry.delete(0, tk.END)
+        self.rec_entry.insert(0, self._suggested_titles[selection[0]])
+        self._hide_suggestions()
+        self.rec_entry.focus_set()
+        return True
+
+    def _hide_suggestions(self):
+        if self._suggest_after_id is not None:
+            self.master.after_cancel(self._suggest_after_id)
+            self._suggest_after_id = None
+        self.rec_suggestions.place_forget()
 
     def get_recommendations(self):
+        self._hide_suggestions()
         user_fav_song = self.rec_entry.get().strip()
         if not user_fav_song:
             messagebox.showwarning("Uyarı", "Lütfen öneri almak için bir şarkı adı girin.")
@@ -302,30 +765,158 @@ class MusicPlayerApp:
             messagebox.showwarning("Uyarı", "Öneri verileri yüklenemedi. Lütfen 'song_data.json' dosyasını kontrol edin.")
             return
             
-        recommendations = self.recommender.get_song_recommendations(user_fav_song, num_recommendations=5)
-        
-        self.rec_results_text.config(state="normal") 
-        self.rec_results_text.delete(1.0, tk.END) 
+        self._show_recommendation_text("Öneriler hazırlanıyor...")
+        self.recommendation_service.recommend_song(user_fav_song, 5, self._show_song_recommendations,
+                                                   self._show_recommendation_error)
+
+    def _show_recommendation_text(self, text):
+        self.rec_results_text.config(state="normal")
+        self.rec_results_text.delete(1.0, tk.END)
+        self.rec_results_text.insert(tk.END, text)
+        self.rec_results_text.config(state="disabled")
+
+    def _show_recommendation_error(self, message):
+        self._show_recommendation_text("Öneriler alınamadı.")
+        messagebox.showerror("Öneri Hatası", message)
+
+    def _show_song_recommendations(self, matched_title, recommendations):
+        if not recommendations:
+            self._show_recommendation_text("Öneri bulunamadı veya girilen şarkı veritabanında yok.")
+            return
+        # Yazım hatası ya da harf farkı varsa eşleşen başlık gösterilir
+        lines = [f"'{matched_title}' şarkısına benzer öneriler:"]
+        lines.extend(f"{i+1}. {song}" for i, song in enumerate(recommendations))
+        self._show_recommendation_text("\n".join(lines) + "\n")
 
-        if recommendations:
-            self.rec_results_text.insert(tk.END, f"'{user_fav_song}' şarkısına benzer öneriler:\n")
-            for i, song in enumerate(recommendations):
-                self.rec_results_text.insert(tk.END, f"{i+1}. {song}\n")
-        else:
-            self.rec_results_text.insert(tk.END, "Öneri bulunamadı veya girilen şarkı veritabanında yok.")
-        
-        self.rec_results_text.config(state="disabled") 
+    def get_playlist_recommendations(self):
+        """Çalma listesinin tamamını (boşsa beğenilenleri) tohum alarak öneri yapar."""
+        if self.recommender.df.empty:
+            messagebox.showwarning("Uyarı", "Öneri verileri yüklenemedi. Lütfen 'song_data.json' dosyasını kontrol edin.")
+            return
+
+        seeds = self.current_playlist
+        source = "çalma listesine"
+        if not seeds:
+            seeds = _read_favorites()
+            source = "beğenilen şarkılara"
+        if not seeds:
+            messagebox.showwarning("Uyarı", "Öneri için önce bir çalma listesi yükleyin.")
+            return
+
+        def show(recommendations):
+            if not recommendations:
+                self._show_recommendation_text("Listedeki şarkılar öneri veritabanında bulunamadı.")
+                return
+            lines = [f"Mevcut {source} benzer öneriler:"]
+            lines.extend(f"{i+1}. {title} ({score:.2f})" for i, (title, _, score) in enumerate(recommendations))
+            self._show_recommendation_text("\n".join(lines) + "\n")
+
+        self._show_recommendation_text("Öneriler hazırlanıyor...")
+        self.recommendation_service.recommend_playlist(seeds, 10, show, self._show_recommendation_error)
+
+    def analyze_library(self):
+        """Katalog ve çalma listesindeki şarkıların ses özelliklerini arka planda çıkarır."""
+        if self._analysis_state is not None:
+            return
+        filepaths = [f for f in self.recommender.catalog_filepaths() if f] + list(self.current_playlist)
+        if not filepaths:
+            messagebox.showwarning("Uyarı", "Analiz edilecek şarkı bulunamadı.")
+            return
+
+        self._analysis_state = {"done": 0, "total": 0, "finished": False}
+        state = self._analysis_state
+
+        def progress(done, total):
+            state["done"], state["total"] = done, total
+
+        def run():
+            try:
+                AnalysisPipeline(batch_size=16).run(filepaths, progress)
+            except Exception as e:
+                print(f"Kütüphane analizi başarısız oldu: {e}")
+            state["finished"] = True
+
+        threading.Thread(target=run, daemon=True).start()
+        self.status_label.config(text="Ses analizi başlatıldı...")
+        self.master.after(500, self._poll_analysis)
+
+    def _poll_analysis(self):
+        state = self._analysis_state
+        if not state["finished"]:
+            if state["total"]:
+                self.status_label.config(text=f"Ses analizi: {state['done']}/{state['total']}")
+            self.master.after(500, self._poll_analysis)
+            return
+
+        self._analysis_state = None
+        self.recommender.load_audio_features()
+        self.status_label.config(text=f"Ses analizi tamamlandı: {state['done']} şarkı işlendi.")
+
+    def analyze_loudness(self):
+        if self._loudness_state is not None:
+            return
+        filepaths = list(self.current_playlist)
+        if not filepaths:
+            messagebox.showwarning("Uyarı", "Analiz edilecek şarkı bulunamadı.")
+            return
+
+        self._loudness_state = {"done": 0, "total": 0, "finished": False,
+                                "scanner": LoudnessScanner(self.library_index, batch_size=16)}
+        state = self._loudness_state
+
+        def progress(done, total):
+            state["done"], state["total"] = done, total
+
+        def run():
+            try:
+                state["scanner"].run(filepaths, progress)
+            except Exception as e:
+                print(f"Ses yüksekliği analizi başarısız oldu: {e}")
+            state["finished"] = True
+
+        threading.Thread(target=run, daemon=True).start()
+        self.status_label.config(text="Ses yüksekliği analizi başlatıldı...")
+        self.master.after(500, self._poll_loudness)
+
+    def _poll_loudness(self):
+        state = self._loudness_state
+        if state is None:
+            return
+        if not state["finished"]:
+            if state["total"]:
+                self.status_label.config(text=f"Ses yüksekliği analizi: {state['done']}/{state['total']}")
+            self.master.after(500, self._poll_loudness)
+            return
+
+        self._loudness_state = None
+        self.status_label.config(text=f"Ses yüksekliği analizi tamamlandı: {state['done']} şarkı ölçüldü.")
+
+    def open_perf_overlay(self):
+        if self.perf_overlay is not None and self.perf_overlay.winfo_exists():
+            self.perf_overlay.lift()
+            return
+        self.perf_overlay = PerfOverlay(self.master)
 
     def on_closing(self):
         """Uygulama kapatıldığında kaynakları temizler."""
         if messagebox.askokcancel("Çıkış", "Uygulamadan çıkmak istediğinizden emin misiniz?"):
             self.stop_song() 
+            self.effect_scheduler.shutdown()
+            self.recommendation_service.shutdown()
+            if self.library_scan is not None:
+                self.library_scan.cancel()
+            if self.playlist_load is not None:
+                self.playlist_load.cancel()
+            if self._loudness_state is not None:
+                self._loudness_state["scanner"].cancel()
+            self.library_index.close()
             pygame.mixer.quit() 
             self.audio_processor.clean_temp_files() 
             self.master.destroy() 
 
 if __name__ == "__main__":
     #
+    tracing.enable_from_env()
 
     root = tk.Tk()
     app = MusicPlayerApp(root)
@@ -0,0 +1,70 @@
+import tkinter as tk
+from tkinter import filedialog, ttk
+
+import tracing
+
+
+class PerfOverlay(tk.Toplevel):
+    """
+    Son span sürelerini ve bellek kullanımını gösteren performans paneli.
+    Panel açıkken izleme etkindir; kapatılınca önceki duruma döner.
+    """
+
+    def __init__(self, master, refresh_ms=500):
+        super().__init__(master)
+        self.title("Performans")
+        self.geometry("520x320")
+        self.refresh_ms = refresh_ms
+        self._was_enabled = tracing.is_enabled()
+        self._after_id = None
+        tracing.enable()
+
+        columns = ("count", "last", "p50", "max")
+        self.tree = ttk.Treeview(self, columns=columns, height=12)
+        self.tree.heading("#0", text="İşlem")
+        self.tree.column("#0", width=220)
+        for column, label in zip(columns, ("Adet", "Son (ms)", "p50 (ms)", "En Yüksek (ms)")):
+            self.tree.heading(column, text=label)
+            self.tree.column(column, width=70, anchor="e")
+        self.tree.pack(fill="both", expand=True, padx=5, pady=5)
+
+        bottom = tk.Frame(self)
+        bottom.pack(fill="x", padx=5, pady=(0, 5))
+        self.memory_label = tk.Label(bottom, anchor="w")
+        self.memory_label.pack(side="left", fill="x", expand=True)
+        tk.Button(bottom, text="Temizle", command=self._clear).pack(side="right", padx=2)
+        tk.Button(bottom, text="İzi Dışa Aktar...", command=self.export_trace).pack(side="right", padx=2)
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self._refresh()
+
+    def _refresh(self):
+        stats = tracing.recent_stats()
+        self.tree.delete(*self.tree.get_children())
+        for name in sorted(stats):
+            s = stats[name]
+            self.tree.insert("", tk.END, text=name, values=(s["count"], f"{s['last_ms']:.1f}",
+                                                             f"{s['p50_ms']:.1f}", f"{s['max_ms']:.1f}"))
+
+        current_mb, peak_mb = tracing.memory_mb()
+        current = f"{current_mb:.0f} MB" if current_mb is not None else "?"
+        peak = f"{peak_mb:.0f} MB" if peak_mb is not None else "?"
+        self.memory_label.config(text=f"Bellek: {current} (tepe {peak})")
+        self._after_id = self.after(self.refresh_ms, self._refresh)
+
+    def _clear(self):
+        tracing.clear()
+
+    def export_trace(self):
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".json",
+                                            filetypes=[("Chrome İzi", "*.json")])
+        if path:
+            count = tracing.export_chrome_trace(path)
+            self.memory_label.config(text=f"{count} olay kaydedildi: {path}")
+
+    def close(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+        if not self._was_enabled:
+            tracing.disable()
+        self.destroy()
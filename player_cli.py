@@ -0,0 +1,169 @@
+"""
+Oynatıcı çekirdeğini Tkinter olmadan çalıştıran komut satırı arayüzü.
+
+Komutlar standart girdiden satır satır okunur, olaylar ve yanıtlar standart
+çıktıya satır başına bir JSON nesnesi olarak yazılır; böylece betiklerle
+binlerce şarkı geçişi sürülebilir:
+
+    printf 'queue a.wav\\nqueue b.wav\\nplay\\nskip\\nstatus\\nquit\\n' | python player_cli.py --null-sink
+
+Komutlar: queue <yol>, load <klasör|çalma_listesi>, play [sıra], pause, resume,
+skip, prev, stop, eq <ön_ayar|k1,...,k10>, volume <0-1>, recommend <başlık>,
+status, wait <saniye>, quit
+"""
+import argparse
+import json
+import os
+import queue
+import shlex
+import sys
+import threading
+import time
+
+# pygame'in açılış mesajı JSON çıktısına karışmasın
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from audio_features import iter_audio_files
+from library_index import LibraryIndex
+from loudness import track_gain
+from player_engine import PlayerEngine
+from playlist_io import iter_playlist
+from tracing import enable_from_env, memory_mb
+
+
+def _emit(kind, **fields):
+    print(json.dumps(dict(fields, event=kind), ensure_ascii=False), flush=True)
+
+
+def _peak_rss_mb():
+    peak_mb = memory_mb()[1]
+    return None if peak_mb is None else round(peak_mb, 1)
+
+
+def _resolve_sources(target):
+    if os.path.isdir(target):
+        return sorted(iter_audio_files(target))
+    if os.path.splitext(target)[1].lower() in (".json", ".jsonl", ".m3u", ".m3u8"):
+        return [entry["path"] for entry in iter_playlist(target)]
+    return [target]
+
+
+class CommandLoop:
+    def __init__(self, engine, poll_ms=20):
+        self.engine = engine
+        self.poll_seconds = poll_ms / 1000
+        self.running = True
+        self._wait_until = None
+
+        engine.on("track_started", lambda index, filepath, latency_ms: _emit(
+            "track_started", index=index, track=os.path.basename(filepath),
+            latency_ms=None if latency_ms is None else round(latency_ms, 3)))
+        engine.on("playback_stopped", lambda: _emit("playback_stopped"))
+        engine.on("paused", lambda: _emit("paused"))
+        engine.on("resumed", lambda: _emit("resumed"))
+        engine.on("eq_changed", lambda gains: _emit("eq_changed", gains=gains))
+        engine.on("error", lambda message: _emit("error", message=message))
+
+    def handle(self, line):
+        parts = shlex.split(line)
+        if not parts:
+            return
+        command, args = parts[0].lower(), parts[1:]
+        engine = self.engine
+        try:
+            if command == "queue":
+                for target in args:
+                    for filepath in _resolve_sources(target):
+                        engine.enqueue(filepath)
+                _emit("queued", playlist_length=len(engine.playlist))
+            elif command == "load":
+                engine.load(filepath for target in args for filepath in _resolve_sources(target))
+                _emit("loaded", playlist_length=len(engine.playlist))
+            elif command == "play":
+                engine.play(int(args[0]) if args else None)
+            elif command == "pause":
+                engine.pause()
+            elif command == "resume":
+                engine.resume()
+            elif command in ("skip", "next"):
+                engine.next()
+            elif command == "prev":
+                engine.previous()
+            elif command == "stop":
+                engine.stop()
+            elif command == "eq":
+                value = " ".join(args)
+                engine.set_eq([float(g) for g in value.split(",")] if "," in value else value or "normal")
+            elif command == "volume":
+                engine.set_volume(float(args[0]))
+            elif command == "recommend":
+                _emit("recommendations", seed=" ".join(args), titles=engine.recommend(" ".join(args)))
+            elif command == "status":
+                _emit("status", eq_latency_ms=engine.eq_latency_ms(), peak_rss_mb=_peak_rss_mb(),
+                      **engine.status())
+            elif command == "wait":
+                self._wait_until = time.monotonic() + float(args[0])
+            elif command == "quit":
+                self.running = False
+            else:
+                _emit("error", message=f"Bilinmeyen komut: {command}")
+        except Exception as e:
+            _emit("error", message=f"{command}: {e}")
+
+    def run(self, lines):
+        """Komutları ayrı bir iş parçacığında okur; motor bu iş parçacığında yoklanır."""
+        commands = queue.Queue()
+
+        def read():
+            for line in lines:
+                commands.put(line)
+            commands.put("quit")
+
+        threading.Thread(target=read, daemon=True).start()
+        while self.running:
+            self.engine.poll()
+            if self._wait_until is not None:
+                if time.monotonic() < self._wait_until:
+                    time.sleep(self.poll_seconds)
+                    continue
+                self._wait_until = None
+            try:
+                self.handle(commands.get(timeout=self.poll_seconds))
+            except queue.Empty:
+                pass
+        self.engine.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kaan Müzik Çalar - arayüzsüz oynatıcı")
+    parser.add_argument("sources", nargs="*", help="Başlangıçta yüklenecek dosyalar, klasörler ya da çalma listeleri")
+    parser.add_argument("--null-sink", action="store_true", help="Ses aygıtı yerine sessiz çıkış kullan")
+    parser.add_argument("--realtime", action="store_true", help="Sessiz çıkışta blokları gerçek süreleriyle tüket")
+    parser.add_argument("--crossfade-ms", type=int, default=0)
+    parser.add_argument("--block-frames", type=int, default=2048)
+    parser.add_argument("--no-repeat", action="store_true", help="Liste sonunda başa dönme")
+    parser.add_argument("--normalize", action="store_true",
+                        help="Kütüphane dizinindeki ölçümlerle ses yüksekliğini eşitle")
+    args = parser.parse_args(argv)
+    enable_from_env()
+
+    options = dict(block_frames=args.block_frames, crossfade_ms=args.crossfade_ms, repeat=not args.no_repeat)
+    if args.normalize:
+        index = LibraryIndex()
+        options["gain_for"] = lambda filepath, eq_gains: track_gain(index, filepath, eq_gains)
+    if args.null_sink:
+        engine = PlayerEngine.headless(realtime=args.realtime, **options)
+    else:
+        import pygame.mixer
+        pygame.mixer.init()
+        engine = PlayerEngine(**options)
+
+    if args.sources:
+        engine.load(filepath for source in args.sources for filepath in _resolve_sources(source))
+        _emit("loaded", playlist_length=len(engine.playlist))
+
+    CommandLoop(engine).run(sys.stdin)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import time
+
+from audio_stream import NullSink, StreamingPlayer
+from equalizer import EQ_BANDS, EqualizerPresets, design_streaming_sos
+from playlist_model import PlaylistModel
+from tracing import instant
+
+
+class PlayerEngine:
+    """
+    Arayüzden bağımsız oynatıcı çekirdeği. Çalma listesi, çalma durumu,
+    boşluksuz geçiş ve ekolayzır burada tutulur; değişiklikler olay olarak
+    yayınlanır. Olay döngüsü sahibi (Tk, komut satırı ya da test) poll()
+    yöntemini düzenli çağırır; geri çağırmalar her zaman poll'u çağıran iş
+    parçacığında çalışır. Tk arayüzü de akış yolunda bu motoru kullanır;
+    yalnızca önceden işlenmiş dosyaları mikserle çalma yolu arayüzde kalır.
+
+    Olaylar: track_started(index, filepath, latency_ms), playback_stopped(),
+    paused(), resumed(), eq_changed(gains), error(message). latency_ms, çalma
+    isteğinden ilk bloğun çıkışa verilmesine kadar geçen süredir; kuyruktan
+    boşluksuz geçişlerde None'dır.
+    """
+
+    def __init__(self, sink=None, block_frames=2048, crossfade_ms=0, presets=None, recommender=None, repeat=True,
+                 gain_for=None):
+        self.player = StreamingPlayer(block_frames=block_frames, crossfade_ms=crossfade_ms, sink=sink)
+        self.presets = presets if presets is not None else EqualizerPresets()
+        self.recommender = recommender
+        # gain_for(dosya_yolu, eq_kazançları) -> doğrusal kazanç; ses yüksekliği eşitleme için
+        self.gain_for = gain_for
+        self.repeat = repeat
+        self.playlist = PlaylistModel()
+        self.current_index = -1
+        self.is_playing = False
+        self.is_paused = False
+        self.eq_gains = self.presets.get_gains("normal")
+        self._listeners = {}
+        self._queued_index = None
+        self._requested_at = None
+
+    @classmethod
+    def headless(cls, realtime=False, **kwargs):
+        """Ses aygıtı gerektirmeyen (NullSink) bir motor oluşturur."""
+        return cls(sink=NullSink(realtime=realtime), **kwargs)
+
+    def on(self, event, callback):
+        self._listeners.setdefault(event, []).append(callback)
+
+    def _emit(self, event, *args):
+        for callback in self._listeners.get(event, ()):
+            callback(*args)
+
+    def load(self, filepaths):
+        self.stop()
+        self.playlist = PlaylistModel(filepaths)
+        self.current_index = -1
+
+    def enqueue(self, filepath):
+        self.playlist.append(filepath)
+        if self.is_playing and self.current_index == len(self.playlist) - 2:
+            # Yeni şarkı çalan şarkının hemen ardındaysa boşluksuz geçiş için kuyruğa alınır
+            self._queue_next()
+
+    def play(self, index=None, start_ms=0):
+        """Şarkıyı (verilmezse geçerli şarkıyı) başlatır; çalma başladıysa True döner."""
+        if not len(self.playlist):
+            self._emit("error", "Çalma listesi boş.")
+            return False
+        if index is None:
+            if self.is_paused:
+                self.resume()
+                return True
+            index = max(self.current_index, 0)
+        self.current_index = index % len(self.playlist)
+        self._requested_at = time.perf_counter()
+        try:
+            filepath = self.playlist[self.current_index]
+            self.player.play(filepath, start_ms=start_ms, gain=self._gain(filepath))
+        except Exception as e:
+            self.stop()
+            self._emit("error", f"Şarkı çalınamadı: {e}")
+            return False
+        self.is_playing = True
+        self.is_paused = False
+        self._queue_next()
+        return True
+
+    def next(self):
+        if len(self.playlist):
+            self.play(self.current_index + 1)
+
+    def previous(self):
+        if len(self.playlist):
+            self.play(self.current_index - 1)
+
+    def pause(self):
+        if self.is_playing and not self.is_paused:
+            self.player.pause()
+            self.is_paused = True
+            self._emit("paused")
+
+    def resume(self):
+        if self.is_paused:
+            self.player.unpause()
+            self.is_paused = False
+            self._emit("resumed")
+
+    def stop(self):
+        self.player.stop()
+        self._queued_index = None
+        self._requested_at = None
+        was_playing = self.is_playing
+        self.is_playing = False
+        self.is_paused = False
+        if was_playing:
+            self._emit("playback_stopped")
+
+    def set_volume(self, volume):
+        self.player.set_volume(volume)
+
+    def set_crossfade(self, crossfade_ms):
+        """Çapraz geçiş süresini değiştirir; kuyruktaki şarkı yeni süreyle yeniden hazırlanır."""
+        if crossfade_ms == self.player.crossfade_ms:
+            return
+        self.player.crossfade_ms = crossfade_ms
+        if self.is_playing and self._queued_index is not None:
+            self._queue_next()
+
+    def set_eq(self, gains_or_preset):
+        """Ön ayar adı ya da 10 bantlık kazanç listesi alır; değişiklik çalan şarkıya anında uygulanır."""
+        if isinstance(gains_or_preset, str):
+            gains = self.presets.get_gains(gains_or_preset)
+        else:
+            gains = [float(g) for g in gains_or_preset]
+            if len(gains) != len(EQ_BANDS):
+                raise ValueError(f"{len(EQ_BANDS)} bant kazancı bekleniyordu, {len(gains)} verildi.")
+        self.eq_gains = tuple(gains)
+        self.player.set_sos(design_streaming_sos(self.eq_gains, self.player.sample_rate))
+        self._emit("eq_changed", gains)
+
+    def recommend(self, seed, num_recommendations=5):
+        if self.recommender is None:
+            from recommendation_engine import RecommendationEngine
+            self.recommender = RecommendationEngine()
+        return self.recommender.get_song_recommendations(seed, num_recommendations)
+
+    def _gain(self, filepath):
+        return self.gain_for(filepath, self.eq_gains) if self.gain_for is not None else 1.0
+
+    def _queue_next(self):
+        self._queued_index = None
+        if len(self.playlist) < 2 or (not self.repeat and self.current_index == len(self.playlist) - 1):
+            return
+        next_index = (self.current_index + 1) % len(self.playlist)
+        next_filepath = self.playlist[next_index]
+        self.player.queue(next_filepath, gain=self._gain(next_filepath))
+        self._queued_index = next_index
+
+    def poll(self):
+        """Şarkı geçişlerini ve sonlarını işleyip ilgili olayları yayınlar."""
+        if self._requested_at is not None and self.player.track_started_at is not None:
+            latency_ms = (self.player.track_started_at - self._requested_at) * 1000
+            self._requested_at = None
+            instant("player.track_started", index=self.current_index, latency_ms=latency_ms)
+            self._emit("track_started", self.current_index, self.playlist[self.current_index], latency_ms)
+
+        if self.player.pop_track_change() and self._queued_index is not None:
+            self.current_index = self._queued_index
+            instant("player.track_started", index=self.current_index, gapless=True)
+            self._emit("track_started", self.current_index, self.playlist[self.current_index], None)
+            self._queue_next()
+        elif self.is_playing and not self.is_paused and not self.player.get_busy():
+            if self.repeat:
+                self.next()
+            else:
+                self.stop()
+
+    def eq_latency_ms(self):
+        """Son EQ değişikliğinin çıkışa ulaşan ilk bloğa uygulanması için geçen süre."""
+        return None if self.player.eq_latency is None else self.player.eq_latency * 1000
+
+    def status(self):
+        filepath = self.playlist[self.current_index] if 0 <= self.current_index < len(self.playlist) else None
+        return {
+            "index": self.current_index,
+            "track": os.path.basename(filepath) if filepath else None,
+            "playing": self.is_playing,
+            "paused": self.is_paused,
+            "position_ms": self.player.get_position_ms() if self.is_playing else 0,
+            "playlist_length": len(self.playlist),
+            "eq_gains": list(self.eq_gains),
+        }
@@ -0,0 +1,187 @@
+import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PLAYLIST_FILETYPES = [("JSONL Çalma Listeleri", "*.jsonl"), ("M3U8 Çalma Listeleri", "*.m3u8"),
+                      ("JSON Dosyaları", "*.json"), ("Tüm Dosyalar", "*.*")]
+METADATA_FIELDS = ("duration", "title", "artist")
+
+
+def _playlist_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".m3u", ".m3u8"):
+        return "m3u8"
+    if ext == ".json":
+        return "json"
+    return "jsonl"
+
+
+def _resolve(base_dir, filepath):
+    return filepath if os.path.isabs(filepath) else os.path.normpath(os.path.join(base_dir, filepath))
+
+
+def iter_playlist(path):
+    """
+    Çalma listesini satır satır okuyup {"path": ..., [duration, title, artist]}
+    sözlükleri üretir. JSONL ve M3U8 akış olarak okunur; eski JSON dizileri
+    (ör. begendiklerim.json) de desteklenir. Göreli yollar listenin klasörüne
+    göre çözülür.
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    playlist_format = _playlist_format(path)
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        if playlist_format == "json":
+            for item in json.load(f):
+                if isinstance(item, str):
+                    yield {"path": _resolve(base_dir, item)}
+                elif isinstance(item, dict) and isinstance(item.get("path"), str):
+                    yield dict(item, path=_resolve(base_dir, item["path"]))
+            return
+
+        if playlist_format == "m3u8":
+            extinf = {}
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                if line.startswith("#EXTINF:"):
+                    duration, _, label = line[len("#EXTINF:"):].partition(",")
+                    artist, separator, title = label.partition(" - ")
+                    extinf = {"title": title if separator else label}
+                    if separator:
+                        extinf["artist"] = artist
+                    try:
+                        if float(duration) >= 0:
+                            extinf["duration"] = float(duration)
+                    except ValueError:
+                        pass
+                elif not line.startswith("#"):
+                    yield dict(extinf, path=_resolve(base_dir, line))
+                    extinf = {}
+            return
+
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, str):
+                entry = {"path": entry}
+            if isinstance(entry, dict) and isinstance(entry.get("path"), str):
+                entry["path"] = _resolve(base_dir, entry["path"])
+                yield entry
+
+
+def save_playlist(path, filepaths, metadata=None):
+    """
+    Çalma listesini biçimi uzantıya göre seçerek yazar. metadata(dosya_yolu)
+    verilirse dönen süre/başlık/sanatçı alanları da saklanır. Dosya önce
+    geçici adla yazılır, ardından yerine taşınır.
+    """
+    playlist_format = _playlist_format(path)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+        if playlist_format == "json":
+            json.dump(list(filepaths), f, ensure_ascii=False)
+        elif playlist_format == "m3u8":
+            f.write("#EXTM3U\n")
+            for filepath in filepaths:
+                info = metadata(filepath) if metadata else None
+                if info and (info.get("title") or info.get("duration")):
+                    duration = int(round(info.get("duration") or -1))
+                    title = info.get("title") or os.path.splitext(os.path.basename(filepath))[0]
+                    label = f"{info['artist']} - {title}" if info.get("artist") else title
+                    f.write(f"#EXTINF:{duration},{label}\n")
+                f.write(filepath)
+                f.write("\n")
+        else:
+            for filepath in filepaths:
+                entry = {"path": filepath}
+                info = metadata(filepath) if metadata else None
+                if info:
+                    entry.update((field, info[field]) for field in METADATA_FIELDS if info.get(field) is not None)
+                f.write(json.dumps(entry, ensure_ascii=False))
+                f.write("\n")
+    os.replace(temp_path, path)
+
+
+class BackgroundPlaylistLoad:
+    """
+    Çalma listesini ayrı bir iş parçacığında akış olarak okur. Dosya
+    varlık denetimleri her toplu işte iş parçacığı havuzunda paralel yapılır
+    ve geçerli şarkılar master.after yoklamasıyla arayüze aktarılır; ilk
+    toplu iş küçük tutulduğundan liste tamamen okunmadan çalma başlayabilir.
+    """
+
+    def __init__(self, master, path, on_batch, on_done, first_batch=50, batch_size=1000, max_workers=16,
+                 poll_ms=50):
+        self.master = master
+        self.on_batch = on_batch
+        self.on_done = on_done
+        self.first_batch = first_batch
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.poll_ms = poll_ms
+        self._cancelled = threading.Event()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, args=(path,), daemon=True)
+        self._thread.start()
+        self._poll_id = master.after(poll_ms, self._poll)
+
+    def _run(self, path):
+        valid = missing = 0
+        error = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                batch = []
+                limit = self.first_batch
+                for entry in iter_playlist(path):
+                    if self._cancelled.is_set():
+                        return
+                    batch.append(entry)
+                    if len(batch) >= limit:
+                        found = self._validate(executor, batch)
+                        valid += len(found)
+                        missing += len(batch) - len(found)
+                        batch = []
+                        limit = self.batch_size
+                if batch:
+                    found = self._validate(executor, batch)
+                    valid += len(found)
+                    missing += len(batch) - len(found)
+        except Exception as e:
+            error = e
+        self._queue.put(("done", (valid, missing, error)))
+
+    def _validate(self, executor, batch):
+        exists = executor.map(os.path.exists, [entry["path"] for entry in batch])
+        found = [entry for entry, ok in zip(batch, exists) if ok]
+        if found:
+            self._queue.put(("batch", found))
+        return found
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "batch":
+                self.on_batch(payload)
+            else:
+                self.on_done(*payload)
+                return
+        self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def cancel(self):
+        self._cancelled.set()
+        if self._poll_id is not None:
+            self.master.after_cancel(self._poll_id)
+            self._poll_id = None
@@ -0,0 +1,109 @@
+import os
+from array import array
+
+
+class PlaylistModel:
+    """
+    Büyük çalma listeleri için sıkıştırılmış model. Klasör yolları bir kez
+    saklanıp numaralandırılır; her şarkı için yalnızca klasör numarası ve
+    ortak bir bayt tamponundaki dosya adının konumu (array) tutulur. Liste
+    gibi indekslenir ve dolaşılır, tam yol yalnızca istendiğinde birleştirilir.
+    """
+
+    __slots__ = ("_directories", "_directory_ids", "_dir_ids", "_name_offsets", "_name_lengths", "_names",
+                 "_garbage")
+
+    def __init__(self, filepaths=()):
+        self.clear()
+        self.extend(filepaths)
+
+    def _intern_directory(self, directory):
+        directory_id = self._directory_ids.get(directory)
+        if directory_id is None:
+            directory_id = len(self._directories)
+            self._directories.append(directory)
+            self._directory_ids[directory] = directory_id
+        return directory_id
+
+    def _store_name(self, name):
+        encoded = name.encode("utf-8", "surrogateescape")
+        offset = len(self._names)
+        self._names += encoded
+        return offset, len(encoded)
+
+    def _name_at(self, offset, length):
+        return self._names[offset:offset + length].decode("utf-8", "surrogateescape")
+
+    def __len__(self):
+        return len(self._dir_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return os.path.join(self._directories[self._dir_ids[index]], self.display_name(index))
+
+    def __iter__(self):
+        directories = self._directories
+        for directory_id, offset, length in zip(self._dir_ids, self._name_offsets, self._name_lengths):
+            yield os.path.join(directories[directory_id], self._name_at(offset, length))
+
+    def __delitem__(self, index):
+        self._garbage += self._name_lengths[index]
+        del self._dir_ids[index]
+        del self._name_offsets[index]
+        del self._name_lengths[index]
+        if self._garbage > len(self._names) // 2:
+            self._compact()
+
+    def _compact(self):
+        """Silinen şarkıların dosya adı baytlarını tampondan atar."""
+        names = bytearray()
+        offsets = array("Q")
+        for offset, length in zip(self._name_offsets, self._name_lengths):
+            offsets.append(len(names))
+            names += self._names[offset:offset + length]
+        self._names = names
+        self._name_offsets = offsets
+        self._garbage = 0
+
+    def display_name(self, index):
+        return self._name_at(self._name_offsets[index], self._name_lengths[index])
+
+    def append(self, filepath):
+        directory, name = os.path.split(filepath)
+        offset, length = self._store_name(name)
+        self._dir_ids.append(self._intern_directory(directory))
+        self._name_offsets.append(offset)
+        self._name_lengths.append(length)
+
+    def extend(self, filepaths):
+        for filepath in filepaths:
+            self.append(filepath)
+
+    def insert(self, index, filepath):
+        directory, name = os.path.split(filepath)
+        offset, length = self._store_name(name)
+        self._dir_ids.insert(index, self._intern_directory(directory))
+        self._name_offsets.insert(index, offset)
+        self._name_lengths.insert(index, length)
+
+    def pop(self, index=-1):
+        filepath = self[index]
+        del self[index]
+        return filepath
+
+    def move(self, source, destination):
+        """Şarkıyı source konumundan destination konumuna taşır."""
+        if source == destination:
+            return
+        for column in (self._dir_ids, self._name_offsets, self._name_lengths):
+            column.insert(destination, column.pop(source))
+
+    def clear(self):
+        self._directories = []
+        self._directory_ids = {}
+        self._dir_ids = array("I")
+        self._name_offsets = array("Q")
+        self._name_lengths = array("I")
+        self._names = bytearray()
+        self._garbage = 0
@@ -0,0 +1,131 @@
+import tkinter as tk
+import tkinter.font as tkfont
+
+
+class VirtualListView(tk.Frame):
+    """
+    Yalnızca görünen satırları çizen liste görünümü. Satırlar sabit sayıda
+    yeniden kullanılan Canvas öğesiyle gösterilir; bu yüzden listenin uzunluğu
+    çizim maliyetini ve bellek kullanımını etkilemez. Seçim ve kaydırma
+    yöntemleri tk.Listbox ile aynı adları taşır.
+    """
+
+    def __init__(self, master, model=None, bg="white", fg="blue", selectbackground="lightblue",
+                 selectforeground="black", height=15, on_activate=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.model = model if model is not None else []
+        self.fg = fg
+        self.selectbackground = selectbackground
+        self.selectforeground = selectforeground
+        self.on_activate = on_activate
+
+        self.font = tkfont.nametofont("TkDefaultFont")
+        self.row_height = self.font.metrics("linespace") + 2
+        self.top = 0
+        self.selected = None
+        self._rows = []
+
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0, height=height * self.row_height)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self._highlight = self.canvas.create_rectangle(0, 0, 0, 0, fill=selectbackground, width=0, state="hidden")
+
+        self.canvas.bind("<Configure>", lambda event: self.refresh())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+        self.canvas.bind("<MouseWheel>", self._on_mouse_wheel)
+        self.canvas.bind("<Button-4>", lambda event: self.yview("scroll", -3, "units"))
+        self.canvas.bind("<Button-5>", lambda event: self.yview("scroll", 3, "units"))
+
+    @property
+    def visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.row_height)
+
+    def set_model(self, model):
+        self.model = model
+        self.top = 0
+        self.selected = None
+        self.refresh()
+
+    def _label(self, index):
+        if hasattr(self.model, "display_name"):
+            return self.model.display_name(index)
+        return str(self.model[index])
+
+    def refresh(self):
+        """Görünen satırları modelden yeniden çizer; liste değiştikten sonra çağrılır."""
+        count = len(self.model)
+        visible = self.visible_rows
+        self.top = max(0, min(self.top, count - visible))
+
+        while len(self._rows) < visible + 1:
+            self._rows.append(self.canvas.create_text(4, 0, anchor="nw", font=self.font))
+        for slot, item in enumerate(self._rows):
+            index = self.top + slot
+            if slot <= visible and index < count:
+                fill = self.selectforeground if index == self.selected else self.fg
+                self.canvas.itemconfigure(item, text=self._label(index), fill=fill, state="normal")
+                self.canvas.coords(item, 4, slot * self.row_height + 1)
+            else:
+                self.canvas.itemconfigure(item, state="hidden")
+
+        if self.selected is not None and self.top <= self.selected <= self.top + visible:
+            y = (self.selected - self.top) * self.row_height
+            self.canvas.coords(self._highlight, 0, y, self.canvas.winfo_width(), y + self.row_height)
+            self.canvas.itemconfigure(self._highlight, state="normal")
+        else:
+            self.canvas.itemconfigure(self._highlight, state="hidden")
+
+        if count:
+            self.scrollbar.set(self.top / count, min(1.0, (self.top + visible) / count))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        if not args:
+            return
+        count = len(self.model)
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * count)
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.refresh()
+
+    def see(self, index):
+        visible = self.visible_rows
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + visible:
+            self.top = index - visible + 1
+        self.refresh()
+
+    def curselection(self):
+        return () if self.selected is None else (self.selected,)
+
+    def selection_clear(self, first=None, last=None):
+        self.selected = None
+        self.refresh()
+
+    def selection_set(self, index):
+        self.selected = index if 0 <= index < len(self.model) else None
+        self.refresh()
+
+    def _index_at(self, y):
+        index = self.top + int(self.canvas.canvasy(y)) // self.row_height
+        return index if index < len(self.model) else None
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        index = self._index_at(event.y)
+        if index is not None:
+            self.selection_set(index)
+
+    def _on_double_click(self, event):
+        self._on_click(event)
+        if self.selected is not None and self.on_activate:
+            self.on_activate(event)
+
+    def _on_mouse_wheel(self, event):
+        self.yview("scroll", -3 if event.delta > 0 else 3, "units")
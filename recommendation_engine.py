@@ -1,18 +1,71 @@
 
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import json
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+import hashlib
 import os
 
+from audio_features import DEFAULT_STORE_PATH, FeatureStore
+from catalog_io import iter_json_records
+from similarity_index import load_or_build_index, top_k_rows
+from tfidf_model import IncrementalTfidfModel
+from title_search import load_or_build_title_index
+from tracing import traced
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "muzikcalar")
+REQUIRED_COLUMNS = ('title', 'artist', 'genre', 'keywords')
+# recommend_batch'te aynı anda bellekte tutulan yoğun skor matrisinin üst sınırı
+SCORE_MEMORY_BUDGET = 64 * 1024 * 1024
+
+
+class _MissingColumns(Exception):
+    pass
+
+
+def file_checksum(filepath, chunk_size=1024 * 1024):
+    digest = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class RecommendationEngine:
-    def __init__(self, song_data_path="song_data.json"):
+    def __init__(self, song_data_path="song_data.json", index_backend="exact", cache_dir=DEFAULT_CACHE_DIR,
+                 audio_feature_weight=0.3, feature_store_path=DEFAULT_STORE_PATH):
         self.song_data_path = song_data_path
+        self.index_backend = index_backend
+        self.cache_dir = cache_dir
+        self.audio_feature_weight = audio_feature_weight
+        self.feature_store_path = feature_store_path
+        self.audio_matrix = None
+        self.has_audio = None
+        self._audio_version = 0
         self.df = None
-        self.tfidf_vectorizer = None
+        self.model = None
         self.tfidf_matrix = None
+        self.similarity_index = None
+        self.title_index = None
+        self.checksum = None
+        self._title_lookup = None
+        self._path_lookup = None
+        self._basename_lookup = None
         self._load_and_process_data()
 
+    @property
+    def model_version(self):
+        """Önerileri etkileyen veri değiştiğinde (katalog ya da ses analizi) değişen sürüm anahtarı."""
+        return self.checksum, self._audio_version
+
+    def _model_dir(self):
+        """Her katalog dosyası kendi model dizinini kullanır; farklı kataloglar birbirinin modelini ezmez."""
+        if not self.cache_dir:
+            return None
+        catalog_id = hashlib.sha1(os.path.abspath(self.song_data_path).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, "model", catalog_id)
+
+    @traced("recommend.load")
     def _load_and_process_data(self):
         if not os.path.exists(self.song_data_path):
             print(f"Hata: Şarkı veri dosyası bulunamadı: {self.song_data_path}")
@@ -20,60 +73,267 @@ class RecommendationEngine:
             return
 
         try:
-            with open(self.song_data_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            self.df = pd.DataFrame(data)
-
-            required_cols = ['title', 'artist', 'genre', 'keywords']
-            if not all(col in self.df.columns for col in required_cols):
-                print(f"Uyarı: '{self.song_data_path}' dosyasında eksik sütunlar var. "
-                      f"Gerekli sütunlar: {required_cols}")
-                self.df = pd.DataFrame()
-                return
-
-            self.df['combined_features'] = self.df.apply(
-                lambda row: ' '.join([
-                    row['genre'].lower().replace(" ", ""),
-                    row['artist'].lower().replace(" ", "")] + 
-                    [kw.lower().replace(" ", "") for kw in row['keywords']]
-                ),
-                axis=1
-            )
-
-            self.tfidf_vectorizer = TfidfVectorizer(stop_words='english') 
-            self.tfidf_matrix = self.tfidf_vectorizer.fit_transform(self.df['combined_features'])
+            self.checksum = file_checksum(self.song_data_path)
+            model_dir = self._model_dir()
+            model = IncrementalTfidfModel.load(model_dir) if model_dir else None
+
+            if model is not None and model.checksum == self.checksum:
+                # Katalog değişmediyse JSON ayrıştırılmaz; kayıtlı model bellek eşlemeli açılır
+                self.model = model
+                self.df = pd.DataFrame(model.columns)
+            else:
+                self.model = model or IncrementalTfidfModel()
+                if not self._update_model():
+                    self.df = pd.DataFrame()
+                    return
+
+            self.tfidf_matrix = self.model.tfidf_matrix()
+            self._build_similarity_index()
+            self._build_title_index()
+            self.load_audio_features()
             print("Öneri motoru verileri başarıyla yüklendi ve işlendi.")
 
         except Exception as e:
             print(f"Şarkı verileri yüklenirken veya işlenirken hata oluştu: {e}")
             self.df = pd.DataFrame()
 
+    def _update_model(self):
+        """
+        Kataloğu (JSON dizisi ya da JSONL) kayıt kayıt okuyarak modeli günceller.
+        Bellekte yalnızca başlık, sanatçı ve dosya yolu sütunları ile seyrek
+        terim matrisi tutulur.
+        """
+        # Sütunlar satırlar modele aktarılırken doldurulur
+        columns = {'title': [], 'artist': [], 'filepath': []}
+        seen_keys = {}
+
+        def rows():
+            for record in iter_json_records(self.song_data_path):
+                if not all(col in record for col in REQUIRED_COLUMNS):
+                    raise _MissingColumns()
+                title, artist, filepath = record['title'], record['artist'], record.get('filepath')
+                columns['title'].append(title)
+                columns['artist'].append(artist)
+                columns['filepath'].append(filepath)
+                yield _row_key(seen_keys, title, artist, filepath), _feature_words(record)
+
+        try:
+            added, removed = self.model.update_rows(rows(), columns)
+        except _MissingColumns:
+            # Yarıda kalan model tutarsızdır, kullanılmaz
+            self.model = None
+            print(f"Uyarı: '{self.song_data_path}' dosyasında eksik sütunlar var. "
+                  f"Gerekli sütunlar: {list(REQUIRED_COLUMNS)}")
+            return False
+
+        print(f"Öneri modeli güncellendi: {added} şarkı eklendi, {removed} şarkı çıkarıldı.")
+
+        self.df = pd.DataFrame(columns)
+        if self._model_dir():
+            try:
+                self.model.save(self._model_dir(), self.checksum)
+            except Exception as e:
+                print(f"Öneri modeli kaydedilemedi: {e}")
+        return True
+
+    def _build_similarity_index(self):
+        index_path = None
+        if self.cache_dir:
+            index_path = os.path.join(self.cache_dir, f"index_{self.index_backend}_{self.checksum}.npz")
+        self.similarity_index = load_or_build_index(self.tfidf_matrix, index_path, self.index_backend)
+
+    def _build_title_index(self):
+        index_path = os.path.join(self.cache_dir, f"titles_{self.checksum}.npz") if self.cache_dir else None
+        self.title_index = load_or_build_title_index(self.df['title'].tolist(), self.df['artist'].tolist(),
+                                                     index_path)
+
+    @traced("recommend.search_titles")
+    def search_titles(self, query, limit=8):
+        """Yazarken öneri için (başlık, sanatçı) listesi döndürür."""
+        if self.title_index is None or not query.strip():
+            return []
+        rows = self.title_index.suggest(query, limit)
+        return list(zip(self.df['title'].iloc[rows], self.df['artist'].iloc[rows]))
+
+    def catalog_filepaths(self):
+        """Katalogdaki dosya yollarını song_data.json konumuna göre çözülmüş olarak döndürür."""
+        if self.df is None or self.df.empty or 'filepath' not in self.df.columns:
+            return []
+        base_dir = os.path.dirname(os.path.abspath(self.song_data_path))
+        return [os.path.join(base_dir, f) if f else None for f in self.df['filepath']]
+
+    def load_audio_features(self):
+        """
+        Ses analizinden gelen tanımlayıcıları kataloğa eşler, standartlaştırır ve
+        kosinüs benzerliği için normalize eder. Analizi olmayan şarkılar yalnızca
+        TF-IDF skoruyla değerlendirilir.
+        """
+        self.audio_matrix = None
+        self.has_audio = None
+        self._audio_version += 1
+        if not self.audio_feature_weight or not self.feature_store_path \
+                or not os.path.exists(self.feature_store_path):
+            return
+
+        store = FeatureStore(self.feature_store_path)
+        vectors = [store.get(f) if f else None for f in self.catalog_filepaths()]
+        has_audio = np.array([v is not None for v in vectors])
+        if has_audio.sum() < 2:
+            return
+
+        matrix = np.zeros((len(vectors), store.values.shape[1]), dtype=np.float32)
+        matrix[has_audio] = np.vstack([v for v in vectors if v is not None])
+        known = matrix[has_audio]
+        matrix[has_audio] = (known - known.mean(axis=0)) / (known.std(axis=0) + 1e-6)
+
+        self.audio_matrix = normalize(matrix)
+        self.has_audio = has_audio
+        print(f"Ses özellikleri yüklendi: {int(has_audio.sum())} şarkı analiz edilmiş.")
+
+    def _blend_audio_scores(self, scores, seed_audio, candidates=None):
+        """Metin skorlarını, iki tarafta da ses analizi olan şarkılar için ses benzerliğiyle karıştırır."""
+        if self.audio_matrix is None or seed_audio is None or not seed_audio.any():
+            return scores
+        audio_matrix = self.audio_matrix if candidates is None else self.audio_matrix[candidates]
+        has_audio = self.has_audio if candidates is None else self.has_audio[candidates]
+        audio_scores = audio_matrix @ seed_audio
+        weight = self.audio_feature_weight
+        return np.where(has_audio, (1 - weight) * scores + weight * audio_scores, scores)
+
+    def _build_lookups(self):
+        """Başlık ve dosya yolu aramaları için sözlükleri bir kez kurar."""
+        self._title_lookup = {}
+        for i, title in enumerate(self.df['title']):
+            self._title_lookup.setdefault(str(title).lower(), i)
+
+        self._path_lookup = {}
+        base_dir = os.path.dirname(os.path.abspath(self.song_data_path))
+        basenames = {}
+        for i, filepath in enumerate(self.df['filepath'] if 'filepath' in self.df.columns else []):
+            if not filepath:
+                continue
+            self._path_lookup.setdefault(_normalize_path(os.path.join(base_dir, filepath)), i)
+            basenames.setdefault(os.path.basename(filepath).lower(), []).append(i)
+        self._basename_lookup = {name: rows[0] for name, rows in basenames.items() if len(rows) == 1}
+
+    def find_song_index(self, seed, fuzzy=False):
+        """
+        Başlık ya da dosya yolu olarak verilen şarkının satır numarasını döndürür.
+        Başlıklar Türkçe harf ve aksan farkları gözetilmeden eşleştirilir;
+        fuzzy verilirse yazım hatalı başlıklar için en yakın eşleşme kullanılır.
+        """
+        if self._title_lookup is None:
+            self._build_lookups()
+
+        index = self._title_lookup.get(seed.lower())
+        if index is None:
+            index = self._path_lookup.get(_normalize_path(seed))
+        if index is None and (os.sep in seed or "/" in seed):
+            index = self._basename_lookup.get(os.path.basename(seed).lower())
+        if index is None and self.title_index is not None:
+            index = self.title_index.best_match(seed) if fuzzy else self.title_index.exact(seed)
+        return index
+
+    def recommend_for_seeds(self, seeds, num_recommendations=5, exclude=None):
+        """
+        Birden çok tohum şarkıdan ortak bir zevk vektörü oluşturup öneri yapar.
+        Sonuç (başlık, dosya_yolu, skor) demetlerinden oluşur; tohumlar ve
+        exclude ile verilen şarkılar sonuçlara dahil edilmez.
+        """
+        return self.recommend_batch([seeds], num_recommendations, [exclude or []])[0]
+
+    @traced("recommend.batch")
+    def recommend_batch(self, seed_lists, num_recommendations=5, excludes=None, memory_budget=SCORE_MEMORY_BUDGET):
+        """
+        Birçok tohum listesi (ör. her kullanıcının çalma listesi) için önerileri
+        seyrek matris çarpımıyla hesaplar. Sorgular, yoğun skor parçası
+        memory_budget baytı aşmayacak büyüklükte gruplar halinde işlenir.
+        """
+        if self.df.empty or not seed_lists:
+            return [[] for _ in seed_lists]
+
+        excludes = excludes or [[] for _ in seed_lists]
+        n_songs = self.tfidf_matrix.shape[0]
+
+        rows, cols, known_rows, known_cols = [], [], [], []
+        for query, (seeds, exclude) in enumerate(zip(seed_lists, excludes)):
+            seed_indices = {i for i in map(self.find_song_index, seeds) if i is not None}
+            known = seed_indices | {i for i in map(self.find_song_index, exclude) if i is not None}
+            rows.extend([query] * len(seed_indices))
+            cols.extend(seed_indices)
+            known_rows.extend([query] * len(known))
+            known_cols.extend(known)
+
+        seed_matrix = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(seed_lists), n_songs))
+        taste = normalize(seed_matrix @ self.tfidf_matrix)
+        audio_taste = normalize(seed_matrix @ self.audio_matrix) if self.audio_matrix is not None else None
+
+        known_mask = sparse.csr_matrix((np.ones(len(known_rows), dtype=bool), (known_rows, known_cols)),
+                                       shape=(len(seed_lists), n_songs))
+        titles = self.df['title'].tolist()
+        filepaths = self.df['filepath'].tolist() if 'filepath' in self.df.columns else [None] * n_songs
+
+        # Her sorgu satırı n_songs float64 skor tutar
+        chunk_size = max(1, memory_budget // (n_songs * np.dtype(np.float64).itemsize))
+        results = []
+        for start in range(0, len(seed_lists), chunk_size):
+            scores = (taste[start:start + chunk_size] @ self.tfidf_matrix.T).toarray()
+            if audio_taste is not None:
+                scores = np.vstack([self._blend_audio_scores(row_scores, seed_audio)
+                                    for row_scores, seed_audio in zip(scores, audio_taste[start:start + chunk_size])])
+            # Dışlananlar yoğun maske kurulmadan seyrek maskenin indisleriyle işaretlenir
+            known = known_mask[start:start + chunk_size]
+            scores[np.repeat(np.arange(known.shape[0]), np.diff(known.indptr)), known.indices] = -np.inf
+            top, top_scores = top_k_rows(scores, num_recommendations)
+            for query, (indices, query_scores) in enumerate(zip(top, top_scores), start):
+                if seed_matrix[query].nnz == 0:
+                    results.append([])
+                    continue
+                results.append([(titles[i], filepaths[i], float(score))
+                                for i, score in zip(indices, query_scores) if np.isfinite(score)])
+        return results
+
+    @traced("recommend.query")
     def get_song_recommendations(self, user_song_title, num_recommendations=5):
        
         if self.df.empty:
             print("Öneri yapılamıyor: Şarkı verileri yüklenemedi veya boş.")
             return []
 
-        user_song_index = self.df[self.df['title'].str.lower() == user_song_title.lower()].index
-        
-        if user_song_index.empty:
+        user_song_index = self.find_song_index(user_song_title, fuzzy=True)
+
+        if user_song_index is None:
             print(f"Üzgünüm, '{user_song_title}' isimli şarkı veritabanımızda bulunamadı.")
             return []
-        
-        user_song_index = user_song_index[0]
 
         user_song_vector = self.tfidf_matrix[user_song_index]
 
-        cosine_sim = cosine_similarity(user_song_vector, self.tfidf_matrix)
+        if self.audio_matrix is not None and self.has_audio[user_song_index]:
+            # Aday kümesi indeksten geniş tutulur, ardından ses benzerliğiyle yeniden sıralanır
+            candidates, scores = self.similarity_index.query(user_song_vector, num_recommendations * 5,
+                                                             exclude=[user_song_index])
+            scores = self._blend_audio_scores(scores, self.audio_matrix[user_song_index], candidates)
+            recommended_indices = candidates[top_k_rows(scores[np.newaxis, :], num_recommendations)[0][0]]
+        else:
+            recommended_indices, _ = self.similarity_index.query(user_song_vector, num_recommendations,
+                                                                 exclude=[user_song_index])
 
-        sim_scores = list(enumerate(cosine_sim[0]))
-        sim_scores = [s for s in sim_scores if s[0] != user_song_index] 
+        return self.df['title'].iloc[recommended_indices].tolist()
 
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
+def _normalize_path(filepath):
+    return os.path.normcase(os.path.abspath(filepath))
 
-        recommended_indices = [i[0] for i in sim_scores[:num_recommendations]]
+def _row_key(seen, title, artist, filepath):
+    """Satır için kalıcı bir anahtar üretir (dosya yolu, yoksa başlık ve sanatçı); tekrarlar numaralanır."""
+    key = filepath or f"{title}\x1f{artist}"
+    count = seen.get(key, 0)
+    seen[key] = count + 1
+    return key if count == 0 else f"{key}#{count}"
 
-        return self.df['title'].iloc[recommended_indices].tolist()
+def _feature_words(record):
+    """Tür, sanatçı ve anahtar kelimeler küçük harfe çevrilip boşlukları atılarak birer kelime olur."""
+    return ([record['genre'].lower().replace(" ", ""), record['artist'].lower().replace(" ", "")] +
+            [kw.lower().replace(" ", "") for kw in record['keywords']])
 
 if __name__ == "__main__":
     recommender = RecommendationEngine()
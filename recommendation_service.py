@@ -0,0 +1,117 @@
+import hashlib
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from title_search import normalize_text
+
+
+class RecommendationService:
+    """
+    Öneri sorgularını Tk iş parçacığı dışında çalıştırır. Sonuçlar
+    (normalize tohum, k, model sürümü) anahtarıyla sınırlı bir LRU önbellekte
+    tutulur; yeni bir istek, bekleyen ve sürmekte olan eski istekleri geçersiz
+    kılar. Geri çağırmalar ana döngüye master.after yoklamasıyla iletilir.
+    """
+
+    def __init__(self, master, engine, cache_size=256, poll_ms=30):
+        self.master = master
+        self.engine = engine
+        self.cache_size = cache_size
+        self.poll_ms = poll_ms
+        self._cache = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._results = queue.Queue()
+        self._generation = 0
+        self._future = None
+        self._poll_id = None
+
+    def recommend_song(self, title, num_recommendations, on_done, on_error=None):
+        """
+        on_done(eşleşen_başlık_ya_da_None, öneriler) ana iş parçacığında çağrılır;
+        sorgu hata verirse on_error(mesaj) çağrılır.
+        """
+        key = ("song", normalize_text(title), num_recommendations, self.engine.model_version)
+        return self._request(key, self._song_query, (title, num_recommendations), on_done, on_error)
+
+    def recommend_playlist(self, seeds, num_recommendations, on_done, on_error=None):
+        """on_done(öneriler) ana iş parçacığında çağrılır; öneriler (başlık, yol, skor) üçlüleridir."""
+        seeds = list(seeds)
+        digest = hashlib.sha1("\n".join(seeds).encode("utf-8", "surrogateescape")).hexdigest()
+        key = ("playlist", digest, num_recommendations, self.engine.model_version)
+        return self._request(key, lambda: (self.engine.recommend_for_seeds(seeds, num_recommendations),), (),
+                             on_done, on_error)
+
+    def _song_query(self, title, num_recommendations):
+        index = self.engine.find_song_index(title, fuzzy=True)
+        if index is None:
+            return None, []
+        matched_title = self.engine.df['title'].iloc[index]
+        return matched_title, self.engine.get_song_recommendations(matched_title, num_recommendations)
+
+    def _request(self, key, query, args, on_done, on_error):
+        self.supersede()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            on_done(*cached)
+            return True
+
+        generation = self._generation
+        self._future = self._executor.submit(query, *args)
+        self._future.add_done_callback(
+            lambda future: self._results.put((generation, key, future, on_done, on_error)))
+        self._ensure_polling()
+        return False
+
+    def supersede(self):
+        """Bekleyen isteği iptal eder; çalışmakta olanın sonucu yok sayılır."""
+        self._generation += 1
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def _ensure_polling(self):
+        if self._poll_id is None:
+            self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                generation, key, future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if future.cancelled():
+                continue
+            try:
+                result = future.result()
+            except Exception as e:
+                # Hatalı sonuç önbelleğe alınmaz; güncel istekse arayüz bekleme durumundan çıkarılır
+                if generation == self._generation:
+                    self._future = None
+                    if on_error is not None:
+                        on_error(f"Öneri sorgusu başarısız oldu: {e}")
+                continue
+
+            # Eski isteklerin sonuçları da önbelleğe alınır, ancak arayüze iletilmez
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            if generation == self._generation:
+                self._future = None
+                on_done(*result)
+
+        if self._future is not None:
+            self._ensure_polling()
+
+    def clear(self):
+        self._cache.clear()
+
+    def shutdown(self):
+        self.supersede()
+        if self._poll_id is not None:
+            self.master.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "muzikcalar", "renders")
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+class RenderCache:
+    """
+    İşlenmiş ses çıktıları için içerik adresli, kalıcı disk önbelleği.
+    Anahtar; kaynak dosyanın yolu/boyutu/değişiklik zamanı ile efekt zinciri
+    ve parametrelerinden üretilir. Boyut bütçesi aşıldığında en uzun süredir
+    kullanılmayan kayıtlar silinir (LRU).
+    """
+
+    INDEX_FILENAME = "index.json"
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._entries = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            self._entries = {key: entry for key, entry in entries.items()
+                             if os.path.exists(os.path.join(self.cache_dir, entry["file"]))}
+        except Exception as e:
+            print(f"Önbellek dizini okunamadı, sıfırdan başlanıyor: {e}")
+            self._entries = {}
+
+    def _save_index(self):
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+        os.replace(temp_path, self.index_path)
+
+    @staticmethod
+    def make_key(source_filepath, effect_chain, params):
+        stat = os.stat(source_filepath)
+        fingerprint = json.dumps({
+            "source": os.path.abspath(source_filepath),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "chain": effect_chain,
+            "params": params,
+        }, sort_keys=True)
+        return hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
+
+    def path_for(self, key, ext):
+        return os.path.join(self.cache_dir, f"{key}{ext}")
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            filepath = os.path.join(self.cache_dir, entry["file"])
+            if not os.path.exists(filepath):
+                del self._entries[key]
+                return None
+            entry["last_access"] = time.time()
+            self._save_index()
+            return filepath
+
+    def add(self, key, filepath):
+        with self._lock:
+            self._entries[key] = {
+                "file": os.path.basename(filepath),
+                "size": os.path.getsize(filepath),
+                "last_access": time.time(),
+            }
+            self._evict(keep=key)
+            self._save_index()
+
+    def total_bytes(self):
+        return sum(entry["size"] for entry in self._entries.values())
+
+    def _evict(self, keep=None):
+        total = self.total_bytes()
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Önbellek dosyası silinemedi: {entry['file']} - {e}")
+                continue
+            total -= entry["size"]
+            del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                try:
+                    os.remove(os.path.join(self.cache_dir, entry["file"]))
+                except FileNotFoundError:
+                    pass
+            self._entries = {}
+            self._save_index()
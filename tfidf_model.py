@@ -0,0 +1,257 @@
+import hashlib
+import json
+import os
+import uuid
+from array import array
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+MODEL_VERSION = 3
+ARRAY_NAMES = ("counts_data", "counts_indices", "counts_indptr", "doc_freq", "row_hashes")
+STRING_NAMES = ("terms", "row_keys")
+
+
+def _document_hash(document):
+    return int.from_bytes(hashlib.blake2b(document.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class IncrementalTfidfModel:
+    """
+    TfidfVectorizer(stop_words='english') ile aynı sonucu veren, ancak ham terim
+    sayılarını ve belge frekanslarını saklayarak katalogdaki eklemeleri ve
+    silmeleri yeniden eğitim yapmadan işleyebilen TF-IDF modeli. Terimler,
+    satır anahtarları ve katalog sütunları dahil tüm diziler .npy olarak
+    kaydedilir ve açılışta bellek eşlemeli (mmap) yüklenir. Her kayıt
+    yeni bir nesil kimliğiyle ayrı dosyalara yazılır; meta.json bu kimliği
+    gösterecek şekilde en son ve atomik olarak değiştirilir.
+    """
+
+    def __init__(self):
+        self.analyzer = TfidfVectorizer(stop_words='english').build_analyzer()
+        self.vocabulary = {}
+        self.terms = []
+        self.doc_freq = np.zeros(0, dtype=np.int64)
+        self.counts = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self.row_keys = []
+        self.row_hashes = np.zeros(0, dtype=np.uint64)
+        self.columns = {}
+        self.checksum = None
+
+    @property
+    def n_docs(self):
+        return self.counts.shape[0]
+
+    def _ensure_vocabulary(self):
+        """Yüklenen modelde terim sözlüğü yalnızca model güncellenirken kurulur."""
+        if self.vocabulary is None:
+            self.terms = self.terms.tolist()
+            self.vocabulary = {term: column for column, term in enumerate(self.terms)}
+
+    def _word_columns(self, word):
+        """Boşluk içermeyen bir kelimenin terim sütunları; yeni terimler sözlüğe eklenir."""
+        columns = []
+        for token in self.analyzer(word):
+            column = self.vocabulary.get(token)
+            if column is None:
+                column = len(self.terms)
+                self.vocabulary[token] = column
+                self.terms.append(token)
+            columns.append(column)
+        return columns
+
+    def update(self, documents, keys, columns=None):
+        """Belgeleri düz metin olarak alan update_rows sarmalayıcısı."""
+        return self.update_rows(((key, [document]) for key, document in zip(keys, documents)), columns)
+
+    def update_rows(self, rows, columns=None):
+        """
+        Modeli verilen katalog durumuna getirir. rows, (anahtar, kelimeler)
+        çiftleri üreten bir yineleyicidir ve tek geçişte tüketilir; belge
+        metni kelimelerin boşlukla birleşimidir. Anahtarı ve belgesi değişmeyen
+        satırlar yeniden işlenmez; yeni ya da değişmiş satırlarda her farklı
+        kelime bir kez tokenize edilir, silinen satırların belge frekansı geri
+        alınır. Dönen değer: (eklenen, silinen) satır sayıları.
+        """
+        self._ensure_vocabulary()
+        existing = {(key, int(h)): row for row, (key, h) in enumerate(zip(self.row_keys, self.row_hashes))}
+
+        keys = []
+        hashes = array('Q')
+        kept_rows = array('q')
+        indices = array('i')
+        indptr = array('q', [0])
+        word_columns = {}
+        for key, words in rows:
+            h = _document_hash(' '.join(words))
+            row = existing.pop((key, h), None)
+            if row is None:
+                for word in words:
+                    columns_of_word = word_columns.get(word)
+                    if columns_of_word is None:
+                        columns_of_word = word_columns[word] = self._word_columns(word)
+                    indices.extend(columns_of_word)
+                indptr.append(len(indices))
+            keys.append(key)
+            hashes.append(h)
+            kept_rows.append(-1 if row is None else row)
+
+        removed_rows = sorted(existing.values())
+        if removed_rows:
+            removed = self.counts[removed_rows]
+            self.doc_freq = self.doc_freq - np.bincount(removed.indices, minlength=len(self.doc_freq))
+
+        n_new = len(indptr) - 1
+        n_terms = len(self.terms)
+        added = sparse.csr_matrix((np.ones(len(indices), dtype=np.int32), np.frombuffer(indices, dtype=np.int32),
+                                   np.frombuffer(indptr, dtype=np.int64)), shape=(n_new, n_terms))
+        # Satır içinde tekrarlanan terimler tek girdide toplanır (terim sayısı)
+        added.sum_duplicates()
+
+        doc_freq = np.zeros(n_terms, dtype=np.int64)
+        doc_freq[:len(self.doc_freq)] = self.doc_freq
+        doc_freq += np.bincount(added.indices, minlength=n_terms)
+        self.doc_freq = doc_freq
+
+        # Eski satırlar ve yeni satırlar katalog sırasına göre tek matriste birleştirilir
+        old_counts = sparse.csr_matrix((self.counts.data, self.counts.indices, self.counts.indptr),
+                                       shape=(self.n_docs, n_terms))
+        stacked = sparse.vstack([old_counts, added], format="csr")
+        order = np.frombuffer(kept_rows, dtype=np.int64).copy()
+        order[order < 0] = self.n_docs + np.arange(n_new)
+        self.counts = stacked[order] if len(order) else sparse.csr_matrix((0, n_terms), dtype=np.int32)
+
+        self.row_keys = keys
+        self.row_hashes = np.frombuffer(hashes, dtype=np.uint64).copy()
+        if columns is not None:
+            self.columns = {name: list(values) for name, values in columns.items()}
+        return n_new, len(removed_rows)
+
+    def idf(self):
+        n_docs = self.n_docs
+        return np.log((1 + n_docs) / (1 + self.doc_freq)) + 1
+
+    def tfidf_matrix(self):
+        """
+        Satırları L2 normalize edilmiş float32 TF-IDF matrisi. Yalnızca ağırlık
+        dizisi yeni ayrılır; indis dizileri (mmap dahil) kopyalanmadan paylaşılır.
+        """
+        counts = self.counts
+        weights = counts.data.astype(np.float32)
+        weights *= self.idf().astype(np.float32)[counts.indices]
+        rows = np.repeat(np.arange(self.n_docs), np.diff(counts.indptr))
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=self.n_docs))
+        norms[norms == 0] = 1
+        weights /= norms.astype(np.float32)[rows]
+        matrix = sparse.csr_matrix(counts.shape, dtype=np.float32)
+        matrix.data, matrix.indices, matrix.indptr = weights, counts.indices, counts.indptr
+        return matrix
+
+    def _prune_unused_terms(self):
+        """Silinen satırlardan kalan, hiçbir belgede geçmeyen (df=0) terimleri atar."""
+        used = self.doc_freq > 0
+        if used.all():
+            return
+        self._ensure_vocabulary()
+        new_columns = np.cumsum(used) - 1
+        self.counts = sparse.csr_matrix((self.counts.data, new_columns[self.counts.indices].astype(np.int32),
+                                         self.counts.indptr), shape=(self.n_docs, int(used.sum())))
+        self.doc_freq = self.doc_freq[used]
+        self.terms = [term for term, keep in zip(self.terms, used) if keep]
+        self.vocabulary = {term: column for column, term in enumerate(self.terms)}
+
+    def save(self, directory, checksum):
+        self._prune_unused_terms()
+        os.makedirs(directory, exist_ok=True)
+        generation = uuid.uuid4().hex
+        arrays = {name: array for name, array in zip(
+            ARRAY_NAMES, (self.counts.data, self.counts.indices, self.counts.indptr, self.doc_freq, self.row_hashes))}
+        arrays["terms"] = _string_array(self.terms)
+        arrays["row_keys"] = _string_array(self.row_keys)
+        for name, values in self.columns.items():
+            arrays[f"column_{name}"] = _string_array(values)
+        for name, array in arrays.items():
+            # Önceki neslin dosyaları hâlâ bellek eşlemeli açık olabilir; onlara dokunulmaz
+            with open(os.path.join(directory, f"{name}.{generation}.npy"), 'wb') as f:
+                np.save(f, np.asarray(array))
+
+        meta = {
+            "version": MODEL_VERSION,
+            "generation": generation,
+            "checksum": checksum,
+            "shape": list(self.counts.shape),
+            "columns": list(self.columns),
+            # Bu sütunlardaki boş dizgiler yüklenirken yeniden None olur
+            "nullable_columns": [name for name, values in self.columns.items()
+                                 if any(value is None for value in values)],
+        }
+        temp_path = os.path.join(directory, "meta.json.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        # Yeni nesil meta.json değiştirildiği anda geçerli olur; yarıda kalan kayıt eski nesli bozmaz
+        os.replace(temp_path, os.path.join(directory, "meta.json"))
+        self.checksum = checksum
+        _remove_other_generations(directory, generation)
+
+    @classmethod
+    def load(cls, directory):
+        """Kayıtlı modeli açar; kayıt yoksa, eskiyse ya da tutarsızsa None döner."""
+        meta_path = os.path.join(directory, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get("version") != MODEL_VERSION:
+                return None
+
+            generation = meta["generation"]
+
+            def load_array(name):
+                return np.load(os.path.join(directory, f"{name}.{generation}.npy"), mmap_mode="r")
+
+            data, indices, indptr, doc_freq, row_hashes = (load_array(name) for name in ARRAY_NAMES)
+            terms, row_keys = (load_array(name) for name in STRING_NAMES)
+            columns = {name: load_array(f"column_{name}") for name in meta["columns"]}
+            n_docs, n_terms = (int(n) for n in meta["shape"])
+            if (len(indptr) != n_docs + 1 or len(indices) != len(data) or int(indptr[-1]) != len(data)
+                    or len(doc_freq) != n_terms or len(terms) != n_terms
+                    or len(row_hashes) != n_docs or len(row_keys) != n_docs
+                    or any(len(values) != n_docs for values in columns.values())):
+                print(f"Uyarı: Kayıtlı öneri modeli tutarsız, yeniden oluşturulacak: {directory}")
+                return None
+
+            for name in meta["nullable_columns"]:
+                columns[name] = np.where(columns[name] == "", None, columns[name])
+
+            model = cls()
+            model.counts = sparse.csr_matrix((data, indices, indptr), shape=(n_docs, n_terms))
+            model.doc_freq = np.array(doc_freq)
+            model.row_hashes = np.array(row_hashes)
+            # Terim sözlüğü ve satır anahtarları Python nesnelerine ancak model güncellenirken çevrilir
+            model.terms = terms
+            model.vocabulary = None
+            model.row_keys = row_keys
+            model.columns = columns
+            model.checksum = meta["checksum"]
+            return model
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Uyarı: Kayıtlı öneri modeli okunamadı, yeniden oluşturulacak: {e}")
+            return None
+
+
+def _string_array(values):
+    """Dizgi listesini .npy olarak saklanabilen sabit genişlikli bir diziye çevirir; None boş dizgi olur."""
+    return np.array(["" if value is None else str(value) for value in values], dtype=np.str_)
+
+
+def _remove_other_generations(directory, generation):
+    """Geçerli nesle ait olmayan dizi dosyalarını siler; hâlâ açık olanlar sonraki kayda kalır."""
+    for name in os.listdir(directory):
+        if name.endswith(".npy") and name.split(".")[-2] != generation:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
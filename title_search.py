@@ -0,0 +1,169 @@
+import bisect
+import os
+import unicodedata
+
+import numpy as np
+
+# Türkçe büyük/küçük harf ve aksan farkları aramada yok sayılır (İ/I/ı -> i, ş -> s, ...)
+_TURKISH_FOLD = str.maketrans({"İ": "i", "I": "i", "ı": "i", "Ş": "s", "ş": "s", "Ç": "c", "ç": "c",
+                               "Ğ": "g", "ğ": "g", "Ö": "o", "ö": "o", "Ü": "u", "ü": "u"})
+MIN_FUZZY_SCORE = 0.45
+
+
+def normalize_text(text):
+    """Aramada kullanılacak biçim: Türkçe harfler katlanır, aksanlar ve noktalama atılır."""
+    text = unicodedata.normalize("NFKD", str(text).translate(_TURKISH_FOLD).lower())
+    text = "".join(ch if ch.isalnum() else " " for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.split())
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleSearchIndex:
+    """
+    Başlık ve sanatçı üzerinde önceden kurulmuş arama indeksi. Önek eşleşmeleri
+    sıralı başlık dizisinde ikili aramayla, yazım hatalı sorgular ise trigram
+    listeleri üzerinden Dice benzerliğiyle bulunur; hiçbir sorgu kataloğun
+    tamamını taramaz.
+    """
+
+    def __init__(self, normalized_titles, documents, trigram_keys, indptr, postings, trigram_counts):
+        self.normalized_titles = normalized_titles
+        self.documents = documents
+        self.indptr = indptr
+        self.postings = postings
+        self.trigram_counts = trigram_counts
+        self._trigram_ids = {key: i for i, key in enumerate(trigram_keys)}
+        self._trigram_keys = trigram_keys
+
+        self._exact = {}
+        for row, title in enumerate(normalized_titles):
+            self._exact.setdefault(title, row)
+        self._prefix_order = sorted(range(len(normalized_titles)), key=normalized_titles.__getitem__)
+        self._prefix_keys = [normalized_titles[row] for row in self._prefix_order]
+
+    @classmethod
+    def build(cls, titles, artists):
+        normalized_titles = [normalize_text(title) for title in titles]
+        documents = [f"{title} {normalize_text(artist)}".strip() for title, artist in zip(normalized_titles, artists)]
+
+        rows_by_trigram = {}
+        trigram_counts = np.zeros(len(documents), dtype=np.int32)
+        for row, document in enumerate(documents):
+            grams = _trigrams(document)
+            trigram_counts[row] = len(grams)
+            for gram in grams:
+                rows_by_trigram.setdefault(gram, []).append(row)
+
+        trigram_keys = sorted(rows_by_trigram)
+        lengths = [len(rows_by_trigram[key]) for key in trigram_keys]
+        indptr = np.zeros(len(trigram_keys) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        postings = np.fromiter((row for key in trigram_keys for row in rows_by_trigram[key]), dtype=np.int32,
+                               count=int(indptr[-1]))
+        return cls(normalized_titles, documents, trigram_keys, indptr, postings, trigram_counts)
+
+    def exact(self, query):
+        return self._exact.get(normalize_text(query))
+
+    def prefix(self, query, limit=10):
+        query = normalize_text(query)
+        if not query:
+            return []
+        start = bisect.bisect_left(self._prefix_keys, query)
+        rows = []
+        for position in range(start, min(start + limit, len(self._prefix_keys))):
+            if not self._prefix_keys[position].startswith(query):
+                break
+            rows.append(self._prefix_order[position])
+        return rows
+
+    def fuzzy(self, query, limit=10, min_score=MIN_FUZZY_SCORE, max_candidates=2000):
+        """Trigram Dice benzerliği min_score üzerinde olan (satır, skor) çiftlerini döndürür."""
+        query = normalize_text(query)
+        if not query:
+            return []
+        query_grams = _trigrams(query)
+        gram_ids = [self._trigram_ids[g] for g in query_grams if g in self._trigram_ids]
+        if not gram_ids:
+            return []
+
+        # Dice >= min_score için en az min_common ortak trigram gerekir; bu yüzden her aday
+        # en seyrek (len - min_common + 1) trigramdan birini içermek zorundadır
+        n_grams = len(query_grams)
+        min_common = max(1, int(np.ceil(min_score * n_grams / (2 - min_score))))
+        gram_ids.sort(key=lambda g: self.indptr[g + 1] - self.indptr[g])
+        n_rare = len(gram_ids) - min_common + 1
+        if n_rare <= 0:
+            return []
+
+        rare_lists = [self.postings[self.indptr[g]:self.indptr[g + 1]] for g in gram_ids[:n_rare]]
+        rows, hits = np.unique(np.concatenate(rare_lists), return_counts=True)
+        if len(rows) > max_candidates:
+            # Seyrek trigramlarda en çok ortaklığı olan adaylar doğrulanır
+            top = np.argpartition(-hits, max_candidates - 1)[:max_candidates]
+            rows, hits = rows[np.sort(top)], hits[np.sort(top)]
+        for g in gram_ids[n_rare:]:
+            # Trigram listeleri satır sırasındadır; üyelik ikili aramayla sayılır
+            posting = self.postings[self.indptr[g]:self.indptr[g + 1]]
+            positions = np.minimum(np.searchsorted(posting, rows), len(posting) - 1)
+            hits += posting[positions] == rows
+
+        scores = 2 * hits / (n_grams + self.trigram_counts[rows])
+        keep = scores >= min_score
+        rows, scores = rows[keep], scores[keep]
+        if len(rows) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            rows, scores = rows[top], scores[top]
+        order = np.lexsort((rows, -scores))
+        return [(int(rows[i]), float(scores[i])) for i in order]
+
+    def suggest(self, query, limit=8):
+        """Yazarken öneri: önce önek eşleşmeleri, ardından benzer başlıklar."""
+        rows = self.prefix(query, limit)
+        if len(rows) < limit:
+            for row, _ in self.fuzzy(query, limit):
+                if row not in rows:
+                    rows.append(row)
+        return rows[:limit]
+
+    def best_match(self, query):
+        row = self.exact(query)
+        if row is not None:
+            return row
+        matches = self.fuzzy(query, 1)
+        return matches[0][0] if matches else None
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = path + ".tmp.npz"
+        np.savez(temp_path, normalized_titles=np.array(self.normalized_titles, dtype=str),
+                 documents=np.array(self.documents, dtype=str), trigram_keys=np.array(self._trigram_keys, dtype=str),
+                 indptr=self.indptr, postings=self.postings, trigram_counts=self.trigram_counts)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["normalized_titles"].tolist(), data["documents"].tolist(), data["trigram_keys"].tolist(),
+                       data["indptr"], data["postings"], data["trigram_counts"])
+
+
+def load_or_build_title_index(titles, artists, path=None):
+    """Diskteki arama indeksini yükler; yoksa kurup kaydeder."""
+    if path and os.path.exists(path):
+        try:
+            return TitleSearchIndex.load(path)
+        except Exception as e:
+            print(f"Arama indeksi okunamadı, yeniden kuruluyor: {e}")
+
+    index = TitleSearchIndex.build(titles, artists)
+    if path:
+        try:
+            index.save(path)
+        except Exception as e:
+            print(f"Arama indeksi kaydedilemedi: {e}")
+    return index
@@ -0,0 +1,216 @@
+"""
+Sıcak yollar için hafif izleme katmanı.
+
+İzleme varsayılan olarak kapalıdır; kapalıyken span() her çağrıda aynı boş
+nesneyi döndürür, yani maliyet tek bir bayrak kontrolüdür. Açmak için
+enable() çağrılır ya da MUZIKCALAR_TRACE ortam değişkenine bir dosya yolu
+verilir; ortam değişkenini uygulama giriş noktasındaki enable_from_env()
+okur ve iz çıkışta Chrome izi olarak yazılır:
+
+    with span("audio.decode", path=filepath):
+        ...
+
+    @traced("recommend.query")
+    def get_song_recommendations(...): ...
+
+Kayıtlar sabit boyutlu bir halka tamponda tutulur; export_chrome_trace()
+çıktısı chrome://tracing ya da Perfetto ile açılabilir.
+"""
+import atexit
+import collections
+import functools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+MAX_EVENTS = 100000
+RECENT_PER_NAME = 64
+
+_enabled = False
+_events = collections.deque(maxlen=MAX_EVENTS)
+_recent = collections.defaultdict(lambda: collections.deque(maxlen=RECENT_PER_NAME))
+_origin_ns = time.perf_counter_ns()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start_ns")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ns = time.perf_counter_ns() - self.start_ns
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _events.append(("X", self.name, self.start_ns, duration_ns, threading.get_ident(), self.args))
+        _recent[self.name].append(duration_ns)
+        return False
+
+    def set(self, **args):
+        """Span'e sonradan bilinen bilgileri (ör. sonuç sayısı) ekler."""
+        self.args.update(args)
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enable_from_env():
+    """
+    MUZIKCALAR_TRACE ayarlıysa izlemeyi açar ve çıkışta izi o yola yazar.
+    Giriş noktalarında bir kez çağrılır; izlemenin açıldığını döndürür.
+    """
+    trace_path = os.environ.get("MUZIKCALAR_TRACE")
+    if not trace_path:
+        return False
+    # İzi ilk açan süreç sahiplenir. spawn ile başlayan işçiler ortamı
+    # devraldığından sahiplik ortam değişkeniyle işaretlenir; işçiler izlemeyi açmaz.
+    owner_pid = os.environ.setdefault("MUZIKCALAR_TRACE_PID", str(os.getpid()))
+    if owner_pid != str(os.getpid()):
+        return False
+    enable()
+    atexit.register(_export_at_exit, trace_path)
+    return True
+
+
+def clear():
+    _events.clear()
+    _recent.clear()
+
+
+def span(name, **args):
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def instant(name, **args):
+    """Süresi olmayan bir olay (ör. şarkı geçişi) kaydeder."""
+    if _enabled:
+        _events.append(("i", name, time.perf_counter_ns(), 0, threading.get_ident(), args))
+
+
+def traced(name=None):
+    """Fonksiyonun her çağrısını bir span olarak kaydeden dekoratör."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def memory_mb():
+    """(anlık RSS, tepe RSS) megabayt cinsinden; ölçülemeyen değer None döner."""
+    current_mb = peak_mb = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss macOS'ta bayt, Linux'ta kilobayt cinsindendir
+        peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        current_mb = info.rss / (1024 * 1024)
+        if peak_mb is None and getattr(info, "peak_wset", None):
+            # Windows'ta tepe değer çalışma kümesinden okunur
+            peak_mb = info.peak_wset / (1024 * 1024)
+    else:
+        try:
+            with open("/proc/self/statm") as f:
+                current_mb = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        except (OSError, ValueError, IndexError, AttributeError):
+            pass
+    return current_mb, peak_mb
+
+
+def recent_stats():
+    """Her span adı için son ölçümlerin sayısı, son değeri, p50 ve en yüksek değeri (ms)."""
+    stats = {}
+    for name, durations in list(_recent.items()):
+        values = sorted(durations)
+        if not values:
+            continue
+        stats[name] = {
+            "count": len(values),
+            "last_ms": durations[-1] / 1e6,
+            "p50_ms": values[len(values) // 2] / 1e6,
+            "max_ms": values[-1] / 1e6,
+        }
+    return stats
+
+
+def export_chrome_trace(path):
+    """Kayıtları Chrome izleme (Trace Event) biçiminde yazar."""
+    pid = os.getpid()
+    events = []
+    for phase, name, start_ns, duration_ns, tid, args in list(_events):
+        event = {"name": name, "cat": name.split(".", 1)[0], "ph": phase, "pid": pid, "tid": tid,
+                 "ts": (start_ns - _origin_ns) / 1000, "args": args}
+        if phase == "X":
+            event["dur"] = duration_ns / 1000
+        else:
+            event["s"] = "t"
+        events.append(event)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+    os.replace(temp_path, path)
+    return len(events)
+
+
+def _export_at_exit(path):
+    # Süreç havuzu işçileri de çıkarken atexit çalıştırır; dosyayı yalnızca ana süreç yazar
+    if multiprocessing.parent_process() is None:
+        export_chrome_trace(path)
+